@@ -1 +1,5 @@
 """Flow backend package."""
+
+from .config import FlowConfig
+
+__all__ = ["FlowConfig"]
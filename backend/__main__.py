@@ -0,0 +1,7 @@
+"""Allow running the Flow CLI with ``python -m backend``."""
+
+import sys
+
+from .flow import main
+
+sys.exit(main())
@@ -8,13 +8,19 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, List, Optional
+import itertools
 import uvicorn
 import asyncio
-import json
+import os
+import orjson
+import torch
 
+from .batching import AsyncBatcher
 from .config import FlowConfig
-from .refinement_pipeline import RefinementPipeline
+from .refinement_pipeline import PUNCTUATION, RefinementPipeline
+from .scorer import WordScore
 
 # Initialize FastAPI app
 app = FastAPI(title="Flow Highlight API", version="1.0.0")
@@ -31,12 +37,34 @@ app.add_middleware(
 # Global pipeline instance (initialized on startup)
 pipeline = None
 
+# Batchers merging concurrent requests into shared model calls
+score_batcher = None
+candidate_batcher = None
+
+# Minimum PLL gain for a candidate to be returned as a suggestion
+MIN_SUGGESTION_PLL_GAIN = 0.5
+
+# Worker threads processing the sentences of a request concurrently
+sentence_pool = ThreadPoolExecutor(max_workers=8)
+
+# Worker threads running streamed requests. Kept apart from sentence_pool
+# (which they wait on) and from the loop's default executor
+stream_pool = ThreadPoolExecutor(max_workers=8)
+
+# Lowercased words among the most frequent vocabulary entries (set on startup)
+common_words = frozenset()
+
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize the Flow pipeline on server startup."""
-    global pipeline
+    global pipeline, score_batcher, candidate_batcher, common_words
     print("Initializing Flow pipeline...")
+    
+    # Pure inference server: no autograd anywhere, use every core
+    torch.set_grad_enabled(False)
+    torch.set_num_threads(os.cpu_count())
+    
     config = FlowConfig(
         roberta_model="roberta-base",  # Use base model for faster responses
         device="cpu",
@@ -44,16 +72,98 @@ async def startup_event():
         min_pll_gain=1.5,
         min_sbert_cosine=0.95
     )
+    # RoBERTa, SBERT and NLI are int8-quantized on CPU via config.quantize
     pipeline = RefinementPipeline(config)
+    
+    # Scores are returned unflagged; each request applies its own thresholds.
+    # Grad mode is per-thread, so batches enter inference mode themselves.
+    score_batcher = AsyncBatcher(
+        torch.inference_mode()(pipeline.scorer.score_sentences),
+        max_batch_size=16, max_wait_ms=20
+    )
+    candidate_batcher = AsyncBatcher(
+        torch.inference_mode()(pipeline.generator.generate_candidates_batch),
+        max_batch_size=16, max_wait_ms=20
+    )
+    score_batcher.start()
+    candidate_batcher.start()
+    
+    common_words = build_common_words(pipeline.aligner.tokenizer)
+    
+    # Warm up the scoring path so the first request doesn't pay for
+    # lazy kernel initialization
+    with torch.inference_mode():
+        warmup = "The quick brown fox jumps over the lazy dog."
+        pipeline.scorer.score_sentence(warmup, pipeline.constraints.extract_words(warmup))
     print("✓ Pipeline initialized and ready!")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the request batchers."""
+    for batcher in (score_batcher, candidate_batcher):
+        if batcher is not None:
+            await batcher.stop()
+
+
+def build_common_words(tokenizer, top_n: int = 5000) -> frozenset:
+    """
+    Collect the most frequent whole words in the tokenizer's vocabulary.
+    
+    RoBERTa's BPE ids follow merge order, so low ids are the most
+    frequent pieces; word-initial pieces carry the "Ġ" space marker.
+    
+    Args:
+        tokenizer: HuggingFace tokenizer
+        top_n: Number of lowest vocabulary ids to consider
+    
+    Returns:
+        Frozenset of lowercased common words
+    """
+    words = set()
+    for token, token_id in tokenizer.get_vocab().items():
+        if token_id < top_n and token.startswith("Ġ"):
+            word = token[1:]
+            if word.isalpha():
+                words.add(word.lower())
+    return frozenset(words)
+
+
+def cheap_screen(words: List[str]) -> bool:
+    """
+    Decide whether a sentence is worth a full scoring pass.
+    
+    Sentences made up only of very common words rarely contain clunky
+    words, so they can skip the masked-LM forwards entirely. This is
+    lossy, so it only applies when screening is enabled (see
+    FlowConfig.screen_common_sentences).
+    
+    Args:
+        words: Words of the sentence
+    
+    Returns:
+        True if the sentence contains at least one uncommon word
+    """
+    return any(
+        word.lower() not in common_words
+        for word in words
+        if word not in PUNCTUATION
+    )
+
+
+def is_flagged(score, request) -> bool:
+    """Check a word score against the request's thresholds."""
+    return score.entropy >= request.min_entropy or score.rank >= request.max_rank
+
+
 # Request/Response models
 class HighlightRequest(BaseModel):
     text: str
     min_entropy: Optional[float] = 4.0
     max_rank: Optional[int] = 50
     top_suggestions: Optional[int] = 3
+    # Skip sentences made only of common words; None uses the server config
+    screen_common_sentences: Optional[bool] = None
 
 
 class Suggestion(BaseModel):
@@ -101,7 +211,7 @@ class ProgressUpdate(BaseModel):
     message: str
 
 
-async def send_progress(stage: str, current: int, total: int, message: str):
+def progress_message(stage: str, current: int, total: int, message: str) -> dict:
     """Helper to create progress update."""
     return {
         "stage": stage,
@@ -112,178 +222,325 @@ async def send_progress(stage: str, current: int, total: int, message: str):
     }
 
 
-@app.post("/api/highlight-stream")
-async def highlight_text_stream(request: HighlightRequest):
+@torch.inference_mode()
+def process_sentence(
+    request: HighlightRequest,
+    sentence: str,
+    words: List[str],
+    clunky_scores: List[WordScore],
+    sentence_start: int,
+    progress: Callable[[str, int, int, str], None],
+    word_numbers: Iterator[int],
+    total_words_to_check: int
+) -> List[dict]:
     """
-    Highlight text with progress updates via Server-Sent Events.
+    Generate and evaluate suggestions for the clunky words of one sentence.
+    
+    Args:
+        request: Highlight request
+        sentence: Sentence text
+        words: Words of the sentence
+        clunky_scores: Flagged WordScores of the sentence
+        sentence_start: Character offset of the sentence in request.text
+        progress: Progress callback (stage, current, total, message)
+        word_numbers: Shared counter numbering processed words
+        total_words_to_check: Flagged words across all sentences
+    
+    Returns:
+        Highlighted word dicts for this sentence
     """
-    async def generate():
-        try:
-            # Send initial progress
-            yield f"data: {json.dumps(await send_progress('init', 0, 5, 'Starting analysis'))}\n\n"
-            await asyncio.sleep(0.1)
+    highlighted_words = []
+    
+    input_ids, alignments = pipeline.aligner.encode_and_align(sentence, words)
+    align_map = {a.word_idx: a for a in alignments}
+    context_infos = pipeline.constraints.context_word_infos(sentence)
+    
+    # Embed the original sentence once for all its words
+    sentence_embedding = pipeline.semantic_checker.encode(sentence)
+    
+    # Generate candidates for all flagged words together
+    # (batched with each other and with concurrent requests)
+    flagged = [score for score in clunky_scores if score.word_idx in align_map]
+    batch = candidate_batcher.submit_many_threadsafe([
+        (input_ids, align_map[score.word_idx], score.word_text)
+        for score in flagged
+    ])
+    word_candidates = {
+        score.word_idx: candidates for score, candidates in zip(flagged, batch)
+    }
+    
+    for score in clunky_scores:
+        words_processed = next(word_numbers)
+        
+        # Calculate granular progress (spread across stages 3-4)
+        base_progress = 2 + (words_processed / total_words_to_check) * 2  # 2.0 to 4.0
+        
+        # Send progress for this word
+        progress(
+            'candidates', int(base_progress), 5,
+            f'Analyzing "{score.word_text}" ({words_processed}/{total_words_to_check})'
+        )
+        
+        alignment = align_map.get(score.word_idx)
+        if not alignment:
+            continue
+        
+        # Determine why it's flagged
+        flagged_reasons = []
+        if score.entropy >= request.min_entropy:
+            flagged_reasons.append(f"high uncertainty (H≥{request.min_entropy})")
+        if score.rank >= request.max_rank:
+            flagged_reasons.append(f"low rank (rank≥{request.max_rank})")
+        
+        candidates = word_candidates[score.word_idx]
+        
+        suggestions = []
+        if candidates:
+            # Filter by linguistic constraints
+            candidate_texts = [c.text for c in candidates]
+            original_info = pipeline.constraints.word_info_in_context(
+                score.word_text, context_infos
+            )
+            filtered_texts = pipeline.constraints.filter_candidates_with_info(
+                original_info, candidate_texts, strict=True
+            )
+            filtered_set = set(filtered_texts)
+            filtered_candidates = [c for c in candidates if c.text in filtered_set]
             
-            # Split sentences
-            sentences = pipeline._split_sentences(request.text)
-            yield f"data: {json.dumps(await send_progress('split', 1, 5, f'Found {len(sentences)} sentence(s)'))}\n\n"
-            await asyncio.sleep(0.1)
+            # Send update for candidate generation
+            progress(
+                'candidates', int(base_progress), 5,
+                f'Generating replacements for "{score.word_text}"'
+            )
             
-            highlighted_words = []
-            char_offset = 0
-            total_words_to_check = 0
+            # Skip candidates the fill-mask distribution already rules out:
+            # a replacement far less likely than the original at this slot
+            # rarely gains enough PLL to be suggested
+            prune_floor = (
+                score.log_prob + MIN_SUGGESTION_PLL_GAIN -
+                pipeline.config.candidate_prune_slack
+            )
+            evaluated = [
+                c for c in filtered_candidates[:10]  # Check more candidates, filter later
+                if c.log_prob >= prune_floor
+            ]
+            
+            # Token IDs of each candidate sentence (decoded only if kept)
+            candidate_ids = pipeline.aligner.reconstruct_ids_batch(
+                input_ids,
+                [cand.text for cand in evaluated],
+                alignment,
+                [cand.token_ids for cand in evaluated]
+            )
             
-            # Count total words to check
-            all_sentence_data = []
-            for sentence in sentences:
-                words = pipeline.constraints.extract_words(sentence)
-                scores = pipeline.scorer.score_sentence(
-                    sentence, words, 
-                    min_entropy=request.min_entropy,
-                    max_rank=request.max_rank
+            # Candidates are evaluated together, so report them as one step
+            progress(
+                'evaluating', int(base_progress), 5,
+                f'Evaluating {len(evaluated)} candidate(s) for "{score.word_text}"'
+            )
+            
+            # PLL of the original and every candidate in one batched forward
+            # (the original's is cached, and skipped when nothing survived
+            # pruning)
+            if evaluated:
+                original_pll, new_plls = pipeline._windowed_plls(
+                    input_ids, candidate_ids, alignment
                 )
-                clunky_scores = [
-                    s for s in scores 
-                    if s.is_clunky and s.word_text not in ['.', ',', '!', '?', ';', ':', '"', "'", '(', ')']
-                ]
-                total_words_to_check += len(clunky_scores)
-                all_sentence_data.append((sentence, words, scores, clunky_scores))
+            else:
+                original_pll, new_plls = 0.0, []
             
-            yield f"data: {json.dumps(await send_progress('scoring', 2, 5, f'Found {total_words_to_check} word(s) to check'))}\n\n"
-            await asyncio.sleep(0.05)
+            # Skip suggestions that decrease fluency
+            kept = []
+            for cand, new_ids, new_pll in zip(evaluated, candidate_ids, new_plls):
+                pll_gain = new_pll - original_pll
+                if pll_gain >= MIN_SUGGESTION_PLL_GAIN:
+                    kept.append((cand, pipeline.aligner.reconstruct_text(new_ids), pll_gain))
             
-            # Process sentences with granular progress
-            words_processed = 0
-            char_offset = 0
+            # Compute similarity for all kept candidates in one batch
+            similarities = pipeline.semantic_checker.batch_compute_similarity(
+                sentence, [new_text for _, new_text, _ in kept],
+                original_embedding=sentence_embedding
+            )
             
-            for sentence, words, scores, clunky_scores in all_sentence_data:
-                # Find the actual position of this sentence in the original text
-                sentence_start = request.text.find(sentence, char_offset)
-                if sentence_start == -1:
-                    # Fallback to char_offset if not found
-                    sentence_start = char_offset
-                if clunky_scores:
-                    alignments = pipeline.aligner.align_words_to_tokens(sentence, words)
-                    encoding = pipeline.aligner.tokenizer(sentence, add_special_tokens=True)
-                    input_ids = encoding['input_ids']
-                    
-                    for score in clunky_scores:
-                        words_processed += 1
-                        
-                        # Calculate granular progress (spread across stages 3-4)
-                        base_progress = 2 + (words_processed / total_words_to_check) * 2  # 2.0 to 4.0
-                        
-                        # Send progress for this word
-                        yield f"data: {json.dumps(await send_progress('candidates', int(base_progress), 5, f'Analyzing \"{score.word_text}\" ({words_processed}/{total_words_to_check})'))}\n\n"
-                        
-                        alignment = next((a for a in alignments if a.word_idx == score.word_idx), None)
-                        if not alignment:
-                            continue
-                        
-                        flagged_reasons = []
-                        if score.entropy >= request.min_entropy:
-                            flagged_reasons.append(f"high uncertainty (H≥{request.min_entropy})")
-                        if score.rank >= request.max_rank:
-                            flagged_reasons.append(f"low rank (rank≥{request.max_rank})")
-                        
-                        candidates = pipeline.generator.generate_candidates(
-                            input_ids, alignment, score.word_text
-                        )
-                        
-                        suggestions = []
-                        if candidates:
-                            candidate_texts = [c.text for c in candidates]
-                            filtered_texts = pipeline.constraints.filter_candidates(
-                                score.word_text, candidate_texts, sentence, strict=True
-                            )
-                            filtered_candidates = [c for c in candidates if c.text in filtered_texts]
-                            
-                            # Send update for candidate generation
-                            yield f"data: {json.dumps(await send_progress('candidates', int(base_progress), 5, f'Generating replacements for \"{score.word_text}\"'))}\n\n"
-                            
-                            for cand_idx, cand in enumerate(filtered_candidates[:10], 1):
-                                # Granular progress for each candidate
-                                sub_progress = base_progress + (cand_idx / 10) * 0.1
-                                yield f"data: {json.dumps(await send_progress('evaluating', int(sub_progress), 5, f'Evaluating \"{cand.text}\" for \"{score.word_text}\"'))}\n\n"
-                                
-                                new_text, new_ids = pipeline.aligner.reconstruct_sentence(
-                                    input_ids, cand.text, alignment
-                                )
-                                
-                                original_pll = pipeline.scorer.compute_windowed_pll(
-                                    input_ids, alignment.token_start,
-                                    window_size=pipeline.config.pll_window_size
-                                )
-                                new_pll = pipeline.scorer.compute_windowed_pll(
-                                    new_ids, alignment.token_start,
-                                    window_size=pipeline.config.pll_window_size
-                                )
-                                pll_gain = new_pll - original_pll
-                                
-                                if pll_gain < 0.5:
-                                    continue
-                                
-                                similarity = pipeline.semantic_checker.compute_similarity(
-                                    sentence, new_text
-                                )
-                                passes = (
-                                    pll_gain >= pipeline.config.min_pll_gain and 
-                                    similarity >= pipeline.config.min_sbert_cosine
-                                )
-                                
-                                suggestions.append(Suggestion(
-                                    text=cand.text,
-                                    pll_gain=round(pll_gain, 2),
-                                    similarity=round(similarity, 3),
-                                    log_prob=round(cand.log_prob, 2),
-                                    passes_thresholds=passes,
-                                    rank=cand.rank
-                                ))
-                            
-                            suggestions = suggestions[:request.top_suggestions]
-                        
-                        if suggestions:
-                            word_start = sentence_start + alignment.char_start
-                            word_end = sentence_start + alignment.char_end
-                            highlighted_words.append(HighlightedWord(
-                                word=score.word_text,
-                                start_pos=word_start,
-                                end_pos=word_end,
-                                entropy=round(score.entropy, 2),
-                                rank=score.rank,
-                                log_prob=round(score.log_prob, 2),
-                                flagged_reasons=flagged_reasons,
-                                suggestions=suggestions
-                            ))
+            # Evaluate each candidate
+            for (cand, _, pll_gain), similarity in zip(kept, similarities):
+                # Check if passes thresholds
+                passes = (
+                    pll_gain >= pipeline.config.min_pll_gain and 
+                    similarity >= pipeline.config.min_sbert_cosine
+                )
                 
-                # Update char_offset to the end of this sentence in the original text
-                char_offset = sentence_start + len(sentence)
-            
-            # Send final progress
-            yield f"data: {json.dumps(await send_progress('complete', 5, 5, 'Analysis complete'))}\n\n"
-            await asyncio.sleep(0.1)
+                suggestions.append({
+                    "text": cand.text,
+                    "pll_gain": round(pll_gain, 2),
+                    "similarity": round(similarity, 3),
+                    "log_prob": round(cand.log_prob, 2),
+                    "passes_thresholds": passes,
+                    "rank": cand.rank
+                })
             
-            # Send final result
-            result = HighlightResponse(
-                original_text=request.text,
-                highlighted_words=highlighted_words,
-                total_highlighted=len(highlighted_words),
-                sentence_count=len(sentences)
-            )
-            yield f"data: {json.dumps({'type': 'result', 'data': result.model_dump()})}\n\n"
+            # Only keep top N suggestions after filtering
+            suggestions = suggestions[:request.top_suggestions]
+        
+        # Only highlight words that have viable suggestions
+        if suggestions:
+            # Calculate absolute position in original text
+            word_start = sentence_start + alignment.char_start
+            word_end = sentence_start + alignment.char_end
             
+            highlighted_words.append({
+                "word": score.word_text,
+                "start_pos": word_start,
+                "end_pos": word_end,
+                "entropy": round(score.entropy, 2),
+                "rank": score.rank,
+                "log_prob": round(score.log_prob, 2),
+                "flagged_reasons": flagged_reasons,
+                "suggestions": suggestions
+            })
+    
+    return highlighted_words
+
+
+@torch.inference_mode()
+def run_highlight(
+    request: HighlightRequest,
+    report: Optional[Callable[[dict], None]] = None
+) -> dict:
+    """
+    Highlight clunky words, reporting progress along the way.
+    
+    Runs all blocking pipeline work, so it must be called from a worker
+    thread (model calls go through the batchers on the event loop).
+    The result is built from plain dicts in the shape of
+    HighlightResponse; it is validated once on the way out rather than
+    per suggestion.
+    
+    Args:
+        request: Highlight request
+        report: Optional callback receiving progress update dicts
+    
+    Returns:
+        HighlightResponse-shaped dict with the highlighted words
+    """
+    def progress(stage: str, current: int, total: int, message: str):
+        if report is not None:
+            report(progress_message(stage, current, total, message))
+    
+    # Send initial progress
+    progress('init', 0, 5, 'Starting analysis')
+    
+    # Split sentences
+    sentence_spans = pipeline._split_sentences_with_spans(request.text)
+    sentences = [sentence for sentence, _, _ in sentence_spans]
+    progress('split', 1, 5, f'Found {len(sentences)} sentence(s)')
+    
+    highlighted_words = []
+    total_words_to_check = 0
+    
+    # Score all sentences through the shared batcher, optionally skipping
+    # sentences made up only of common words
+    sentence_words = pipeline.constraints.extract_words_batch(sentences)
+    screen = request.screen_common_sentences
+    if screen is None:
+        screen = pipeline.config.screen_common_sentences
+    needs_scoring = [
+        cheap_screen(words) if screen else True
+        for words in sentence_words
+    ]
+    screened = [
+        (sentence, words)
+        for sentence, words, needed in zip(sentences, sentence_words, needs_scoring)
+        if needed
+    ]
+    screened_scores = iter(score_batcher.submit_many_threadsafe(screened))
+    
+    # Count total words to check
+    all_sentence_data = []
+    for sentence, words, needed in zip(sentences, sentence_words, needs_scoring):
+        scores = next(screened_scores) if needed else []
+        clunky_scores = [
+            s for s in scores 
+            if is_flagged(s, request) and s.word_text not in PUNCTUATION
+        ]
+        total_words_to_check += len(clunky_scores)
+        all_sentence_data.append((sentence, words, clunky_scores))
+    
+    progress('scoring', 2, 5, f'Found {total_words_to_check} word(s) to check')
+    
+    # Process sentences concurrently so their candidate requests can share
+    # batched forwards (next() on itertools.count is atomic under the GIL)
+    word_numbers = itertools.count(1)
+    futures = [
+        sentence_pool.submit(
+            process_sentence, request, sentence, words, clunky_scores,
+            sentence_start, progress, word_numbers, total_words_to_check
+        )
+        for (sentence, words, clunky_scores), (_, sentence_start, _)
+        in zip(all_sentence_data, sentence_spans)
+        if clunky_scores
+    ]
+    for future in futures:
+        highlighted_words.extend(future.result())
+    
+    # Send final progress
+    progress('complete', 5, 5, 'Analysis complete')
+    
+    return {
+        "original_text": request.text,
+        "highlighted_words": highlighted_words,
+        "total_highlighted": len(highlighted_words),
+        "sentence_count": len(sentences)
+    }
+
+
+# Marks the end of a progress stream
+_STREAM_END = object()
+
+
+@app.post("/api/highlight-stream")
+async def highlight_text_stream(request: HighlightRequest):
+    """
+    Highlight text with progress updates via Server-Sent Events.
+    
+    The pipeline runs in a stream_pool thread that pushes messages onto
+    an asyncio.Queue, so the event loop stays free between updates.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    
+    def push(message):
+        loop.call_soon_threadsafe(queue.put_nowait, message)
+    
+    def worker():
+        try:
+            result = run_highlight(request, report=push)
+            push({'type': 'result', 'data': result})
         except Exception as e:
-            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+            push({'type': 'error', 'message': str(e)})
+        finally:
+            push(_STREAM_END)
+    
+    async def generate():
+        task = loop.run_in_executor(stream_pool, worker)
+        while (message := await queue.get()) is not _STREAM_END:
+            yield f"data: {orjson.dumps(message).decode()}\n\n"
+        # Surface anything the worker raised outside its own handler
+        await task
     
     return StreamingResponse(generate(), media_type="text/event-stream")
 
 
 @app.post("/api/highlight", response_model=HighlightResponse)
-async def highlight_text(request: HighlightRequest):
+def highlight_text(request: HighlightRequest):
     """
     Highlight clunky words in the provided text.
     
     Returns detailed information about each highlighted word including
     suggestions for replacements.
+    
+    Declared as a plain function so FastAPI runs the CPU-bound model
+    work in its threadpool instead of blocking the event loop.
     """
     if not pipeline:
         raise HTTPException(status_code=503, detail="Pipeline not initialized")
@@ -292,160 +549,7 @@ async def highlight_text(request: HighlightRequest):
         raise HTTPException(status_code=400, detail="Text cannot be empty")
     
     try:
-        # Split into sentences
-        sentences = pipeline._split_sentences(request.text)
-        
-        highlighted_words = []
-        char_offset = 0
-        
-        for sentence in sentences:
-            # Find the actual position of this sentence in the original text
-            sentence_start = request.text.find(sentence, char_offset)
-            if sentence_start == -1:
-                # Fallback to char_offset if not found
-                sentence_start = char_offset
-            # Extract words
-            words = pipeline.constraints.extract_words(sentence)
-            
-            # Score all words
-            scores = pipeline.scorer.score_sentence(
-                sentence,
-                words,
-                min_entropy=request.min_entropy,
-                max_rank=request.max_rank
-            )
-            
-            # Filter to clunky words
-            clunky_scores = [
-                s for s in scores 
-                if s.is_clunky and s.word_text not in ['.', ',', '!', '?', ';', ':', '"', "'", '(', ')']
-            ]
-            
-            if not clunky_scores:
-                # Update char offset for next sentence
-                char_offset = sentence_start + len(sentence)
-                continue
-            
-            # Get alignments and encoding
-            alignments = pipeline.aligner.align_words_to_tokens(sentence, words)
-            encoding = pipeline.aligner.tokenizer(sentence, add_special_tokens=True)
-            input_ids = encoding['input_ids']
-            
-            # Process each clunky word
-            for score in clunky_scores:
-                # Find alignment
-                alignment = next((a for a in alignments if a.word_idx == score.word_idx), None)
-                if not alignment:
-                    continue
-                
-                # Determine why it's flagged
-                flagged_reasons = []
-                if score.entropy >= request.min_entropy:
-                    flagged_reasons.append(f"high uncertainty (H≥{request.min_entropy})")
-                if score.rank >= request.max_rank:
-                    flagged_reasons.append(f"low rank (rank≥{request.max_rank})")
-                
-                # Generate candidates
-                candidates = pipeline.generator.generate_candidates(
-                    input_ids,
-                    alignment,
-                    score.word_text
-                )
-                
-                suggestions = []
-                
-                if candidates:
-                    # Filter by linguistic constraints
-                    candidate_texts = [c.text for c in candidates]
-                    filtered_texts = pipeline.constraints.filter_candidates(
-                        score.word_text,
-                        candidate_texts,
-                        sentence,
-                        strict=True
-                    )
-                    
-                    filtered_candidates = [
-                        c for c in candidates if c.text in filtered_texts
-                    ]
-                    
-                # Evaluate each candidate
-                for cand in filtered_candidates[:10]:  # Check more candidates, filter later
-                    # Reconstruct sentence
-                    new_text, new_ids = pipeline.aligner.reconstruct_sentence(
-                        input_ids,
-                        cand.text,
-                        alignment
-                    )
-                    
-                    # Compute PLL gain
-                    original_pll = pipeline.scorer.compute_windowed_pll(
-                        input_ids,
-                        alignment.token_start,
-                        window_size=pipeline.config.pll_window_size
-                    )
-                    
-                    new_pll = pipeline.scorer.compute_windowed_pll(
-                        new_ids,
-                        alignment.token_start,
-                        window_size=pipeline.config.pll_window_size
-                    )
-                    
-                    pll_gain = new_pll - original_pll
-                    
-                    # Skip suggestions that decrease fluency
-                    if pll_gain < 0.5:
-                        continue
-                    
-                    # Compute similarity
-                    similarity = pipeline.semantic_checker.compute_similarity(
-                        sentence,
-                        new_text
-                    )
-                    
-                    # Check if passes thresholds
-                    passes = (
-                        pll_gain >= pipeline.config.min_pll_gain and 
-                        similarity >= pipeline.config.min_sbert_cosine
-                    )
-                    
-                    suggestions.append(Suggestion(
-                        text=cand.text,
-                        pll_gain=round(pll_gain, 2),
-                        similarity=round(similarity, 3),
-                        log_prob=round(cand.log_prob, 2),
-                        passes_thresholds=passes,
-                        rank=cand.rank
-                    ))
-                
-                # Only keep top N suggestions after filtering
-                suggestions = suggestions[:request.top_suggestions]
-                
-                # Only highlight words that have viable suggestions
-                if suggestions:
-                    # Calculate absolute position in original text
-                    word_start = sentence_start + alignment.char_start
-                    word_end = sentence_start + alignment.char_end
-                    
-                    highlighted_words.append(HighlightedWord(
-                        word=score.word_text,
-                        start_pos=word_start,
-                        end_pos=word_end,
-                        entropy=round(score.entropy, 2),
-                        rank=score.rank,
-                        log_prob=round(score.log_prob, 2),
-                        flagged_reasons=flagged_reasons,
-                        suggestions=suggestions
-                    ))
-            
-            # Update char offset for next sentence
-            char_offset = sentence_start + len(sentence)
-        
-        return HighlightResponse(
-            original_text=request.text,
-            highlighted_words=highlighted_words,
-            total_highlighted=len(highlighted_words),
-            sentence_count=len(sentences)
-        )
+        return run_highlight(request)
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing text: {str(e)}")
@@ -462,8 +566,6 @@ async def health_check():
 
 
 if __name__ == "__main__":
-    import os
-    
     # Get port from environment variable (for cloud deployment)
     port = int(os.environ.get("PORT", 8000))
     host = os.environ.get("HOST", "0.0.0.0")
@@ -0,0 +1,136 @@
+"""Request batching for sharing model forwards across concurrent callers."""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+
+
+class AsyncBatcher:
+    """
+    Merge concurrent requests into batched calls.
+
+    Items submitted from any request are queued and gathered until either
+    max_batch_size items are waiting or max_wait_ms has passed since the
+    first one arrived. The whole batch is handed to process_batch in the
+    batcher's own worker thread, and each caller's future receives its own
+    result.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 20.0
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            process_batch: Function mapping a list of items to a list of
+                results in the same order (runs in the batcher's thread)
+            max_batch_size: Maximum number of items per batch
+            max_wait_ms: Longest time to wait for a batch to fill up
+        """
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        # A dedicated thread, so batches still run when every thread of the
+        # loop's default executor is blocked waiting on this batcher
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="batcher"
+        )
+
+    def start(self) -> None:
+        """Start the batching loop on the running event loop."""
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._task = self._loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the batching loop and shut down its worker thread."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._executor.shutdown(wait=False)
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Queue an item and wait for its result.
+
+        Args:
+            item: A single input for process_batch
+
+        Returns:
+            The result produced for this item
+        """
+        future = self._loop.create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    def submit_threadsafe(self, item: Any) -> Any:
+        """
+        Submit an item from a worker thread and block until it is done.
+
+        Args:
+            item: A single input for process_batch
+
+        Returns:
+            The result produced for this item
+        """
+        return asyncio.run_coroutine_threadsafe(self.submit(item), self._loop).result()
+
+    def submit_many_threadsafe(self, items: List[Any]) -> List[Any]:
+        """
+        Submit several items from a worker thread and wait for all of them.
+
+        The items are queued together, so they can share a batch.
+
+        Args:
+            items: Inputs for process_batch
+
+        Returns:
+            Results in the same order as items
+        """
+        futures = [
+            asyncio.run_coroutine_threadsafe(self.submit(item), self._loop)
+            for item in items
+        ]
+        return [future.result() for future in futures]
+
+    async def _run(self) -> None:
+        """Collect queued items into batches and process them."""
+        while True:
+            batch = [await self._queue.get()]
+            deadline = self._loop.time() + self.max_wait_ms / 1000.0
+
+            # Wait for more items until the batch is full or time runs out
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            items = [item for item, _ in batch]
+            try:
+                results = await self._loop.run_in_executor(
+                    self._executor, self.process_batch, items
+                )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
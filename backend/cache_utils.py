@@ -0,0 +1,206 @@
+"""Caching utilities shared by the Flow components."""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache with a bounded size."""
+
+    def __init__(self, maxsize: int = 4096):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of entries (0 disables caching)
+        """
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if absent."""
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry if full."""
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for key, computing and storing it on a miss.
+
+        Args:
+            key: Cache key
+            compute: Zero-argument function producing the value
+
+        Returns:
+            Cached or freshly computed value
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+class DiskCache:
+    """
+    Persistent JSON-value cache backed by a SQLite file.
+
+    Keys are hashed with SHA-256, so any JSON-serializable key works.
+    Results survive across processes, which makes repeated CLI runs on
+    the same text cheap.
+    """
+
+    def __init__(self, path: str, namespace: str = ""):
+        """
+        Open (or create) the cache.
+
+        Args:
+            path: SQLite database file
+            namespace: Prefix mixed into every key (e.g. model name and
+                cache format version), so incompatible entries never match
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.namespace = namespace
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def _hash(self, key: Any) -> str:
+        payload = json.dumps([self.namespace, key], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: Any) -> Optional[Any]:
+        """Return the stored value for key, or None if absent."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM cache WHERE key = ?", (self._hash(key),)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: Any, value: Any) -> None:
+        """Store a JSON-serializable value."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value) VALUES (?, ?)",
+                (self._hash(key), json.dumps(value))
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+
+
+class VectorDiskCache:
+    """
+    Persistent vector cache backed by a SQLite file.
+
+    Vectors are stored as float16 bytes (half the size of float32) and
+    come back as float32 arrays. Keys are bytes, e.g. a digest of the text
+    a vector was computed from.
+    """
+
+    # Keys per SELECT, below SQLite's bound-parameter limit
+    LOOKUP_CHUNK = 500
+
+    def __init__(self, path: str, namespace: str = ""):
+        """
+        Open (or create) the cache.
+
+        Args:
+            path: SQLite database file
+            namespace: Prefix mixed into every key (e.g. model name), so
+                vectors from incompatible models never match
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.namespace = namespace.encode("utf-8")
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS vectors (key BLOB PRIMARY KEY, value BLOB NOT NULL)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def _hash(self, key: bytes) -> bytes:
+        return hashlib.blake2b(self.namespace + b"\0" + key, digest_size=16).digest()
+
+    def get_many(self, keys: Sequence[bytes]) -> List[Optional[np.ndarray]]:
+        """Return the stored float32 vector for each key, or None if absent."""
+        hashed = [self._hash(key) for key in keys]
+        found = {}
+        with self._lock:
+            for start in range(0, len(hashed), self.LOOKUP_CHUNK):
+                chunk = hashed[start:start + self.LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                found.update(self._conn.execute(
+                    f"SELECT key, value FROM vectors WHERE key IN ({placeholders})", chunk
+                ).fetchall())
+        return [
+            np.frombuffer(found[key], dtype=np.float16).astype(np.float32)
+            if key in found else None
+            for key in hashed
+        ]
+
+    def put_many(self, items: Sequence[Tuple[bytes, np.ndarray]]) -> None:
+        """Store several vectors in one transaction."""
+        rows = [
+            (self._hash(key), np.asarray(vector, dtype=np.float16).tobytes())
+            for key, vector in items
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO vectors (key, value) VALUES (?, ?)", rows
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._conn.execute("DELETE FROM vectors")
+            self._conn.commit()
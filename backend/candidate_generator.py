@@ -2,7 +2,7 @@
 
 import torch
 import torch.nn.functional as F
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
 from dataclasses import dataclass
 
 from .tokenizer_utils import TokenizerAligner, WordAlignment
@@ -12,26 +12,41 @@ from .scorer import BidirectionalScorer
 @dataclass
 class Candidate:
     """A candidate replacement for a word."""
+    # Declared by hand: dataclass(slots=True) needs Python 3.10
+    __slots__ = ("text", "log_prob", "rank", "token_ids")
+    
     text: str
     log_prob: float
-    rank: int  # rank in the distribution
+    rank: int  # rank of the token in the full-vocabulary distribution (1 = top)
+    # Token IDs of the word as it appears mid-sentence (with the leading-space
+    # marker), or None if they must be tokenized from text
+    token_ids: Optional[Tuple[int, ...]]
 
 
 class CandidateGenerator:
     """Generate candidate replacements for words."""
     
-    def __init__(self, scorer: BidirectionalScorer, top_k: int = 20):
+    def __init__(self, scorer: BidirectionalScorer, top_k: int = 20, pool_factor: int = 10):
         """
         Initialize candidate generator.
         
         Args:
             scorer: BidirectionalScorer instance
             top_k: Number of top candidates to generate
+            pool_factor: Size of the top-k pool taken from the logits, as a
+                multiple of top_k (decoding stops once top_k candidates survive)
         """
         self.scorer = scorer
         self.aligner = scorer.aligner
         self.tokenizer = scorer.tokenizer
         self.top_k = top_k
+        self.pool_factor = pool_factor
+        
+        # Decoded text of every vocabulary entry, and which entries can
+        # ever be valid candidates
+        self._vocab_texts = self._decode_vocabulary()
+        self._valid_mask = self._build_valid_mask()
+        self._space_marked = self._find_space_marked()
     
     def generate_candidates(
         self,
@@ -54,55 +69,180 @@ class CandidateGenerator:
         Returns:
             List of candidate replacements
         """
-        # Mask the entire word span
-        masked_ids = self.aligner.mask_word_span(input_ids, word_alignment)
+        return self.generate_candidates_batch(
+            [(input_ids, word_alignment, original_word)]
+        )[0]
+    
+    @torch.inference_mode()
+    def generate_candidates_batch(
+        self,
+        items: List[Tuple[List[int], WordAlignment, str]]
+    ) -> List[List[Candidate]]:
+        """
+        Generate candidate replacements for several words at once.
+        
+        All masked inputs share batched forward passes, so words from
+        different sentences (or requests) cost one model call per batch.
         
-        # Get logits at the first masked position
-        with torch.no_grad():
-            input_tensor = torch.tensor([masked_ids]).to(self.scorer.device)
-            outputs = self.scorer.model(input_tensor)
-            logits = outputs.logits[0, word_alignment.token_start]
+        Args:
+            items: (input_ids, word_alignment, original_word) triples
         
-        # Get top-k tokens
-        probs = F.softmax(logits, dim=-1)
-        log_probs = F.log_softmax(logits, dim=-1)
+        Returns:
+            List of candidate lists, one per item
+        """
+        if not items:
+            return []
         
-        top_probs, top_indices = torch.topk(probs, k=self.top_k)
+        # Reuse logits the scorer already computed for the same masked input
+        rows = [
+            self.scorer.span_logits(input_ids, word_alignment)
+            for input_ids, word_alignment, _ in items
+        ]
+        missing = [i for i, row in enumerate(rows) if row is None]
         
-        # Decode candidates
-        candidates = []
-        for rank, (prob, idx) in enumerate(zip(top_probs, top_indices)):
-            token_id = idx.item()
-            log_prob = log_probs[token_id].item()
+        if missing:
+            # Mask the entire word span of each remaining item
+            masked_sequences = [
+                self.aligner.mask_word_span(items[i][0], items[i][1])
+                for i in missing
+            ]
+            positions = [items[i][1].token_start for i in missing]
             
-            # Decode token
-            token_text = self.tokenizer.decode([token_id]).strip()
-            
-            # Basic filtering
-            if self._is_valid_candidate(token_text, original_word):
-                candidates.append(Candidate(
-                    text=token_text,
-                    log_prob=log_prob,
-                    rank=rank + 1
-                ))
+            # Get logits at the first masked position
+            computed = self.scorer._masked_logits(masked_sequences, positions)
+            for i, row in zip(missing, computed):
+                rows[i] = row
         
-        return candidates
+        all_logits = torch.stack(rows)
+        
+        return self._decode_candidates(
+            all_logits,
+            [original_word for _, _, original_word in items]
+        )
     
-    def _is_valid_candidate(self, candidate: str, original: str) -> bool:
+    def _decode_candidates(
+        self,
+        logits: torch.Tensor,
+        original_words: List[str]
+    ) -> List[List[Candidate]]:
         """
-        Apply basic filtering to candidate.
+        Turn the logits at masked positions into filtered candidates.
+        
+        Top-k selection, log-prob gathering and decoding each happen once
+        for all rows, with a single tensor-to-list conversion. A pool wider
+        than top_k is taken from the logits so that filtered entries don't
+        reduce the yield; each row is decoded only until top_k survive.
         
         Args:
-            candidate: Candidate word
-            original: Original word
+            logits: Logits at the masked positions [num_words, vocab_size]
+            original_words: Original word text for each row
         
         Returns:
-            True if candidate passes basic filters
+            List of candidate lists, one per row
         """
-        # Don't suggest the same word
-        if candidate.lower() == original.lower():
-            return False
+        # Get top-k valid tokens straight from the logits (softmax is
+        # monotonic), then normalize only the selected entries
+        valid_mask = self._valid_mask.to(logits.device)
+        pool_size = min(self.top_k * self.pool_factor, logits.size(-1))
+        top_logits, top_indices = torch.topk(
+            logits.masked_fill(~valid_mask, float('-inf')),
+            k=pool_size,
+            dim=-1
+        )
+        top_log_probs = top_logits - torch.logsumexp(logits, dim=-1, keepdim=True)
+        
+        # Rank among the whole vocabulary, filtered entries included: the
+        # number of strictly larger logits, found by bisecting each sorted row
+        sorted_logits = logits.sort(dim=-1).values
+        vocab_ranks = (
+            logits.size(-1) -
+            torch.searchsorted(sorted_logits, top_logits.contiguous(), right=True) + 1
+        )
         
+        top_ids = top_indices.tolist()
+        top_lps = top_log_probs.tolist()
+        top_ranks = vocab_ranks.tolist()
+        
+        results = []
+        for row_idx, original_word in enumerate(original_words):
+            # Vocabulary rules are already applied by the mask; only the
+            # comparison with the original word remains. Tokens with and
+            # without the leading-space marker decode to the same word, so
+            # keep only the first (most probable) of each surface form
+            seen = {original_word.lower()}
+            candidates = []
+            for token_id, log_prob, rank in zip(top_ids[row_idx], top_lps[row_idx], top_ranks[row_idx]):
+                if log_prob == float('-inf'):
+                    break  # ran out of valid vocabulary entries
+                
+                # Decode via the precomputed vocabulary table
+                token_text = self._vocab_texts[token_id]
+                token_lower = token_text.lower()
+                if token_lower not in seen:
+                    seen.add(token_lower)
+                    candidates.append(Candidate(
+                        text=token_text,
+                        log_prob=log_prob,
+                        rank=rank,
+                        token_ids=(token_id,) if self._space_marked[token_id] else None
+                    ))
+                    if len(candidates) == self.top_k:
+                        break
+            results.append(candidates)
+        
+        return results
+    
+    def _decode_vocabulary(self) -> List[str]:
+        """
+        Decode every vocabulary entry once.
+        
+        Returns:
+            Stripped text for each token ID up to the model's vocab size
+            (empty for ids past the tokenizer's vocabulary)
+        """
+        vocab_size = self.scorer.model.config.vocab_size
+        num_tokens = min(vocab_size, len(self.tokenizer))
+        texts = self.tokenizer.batch_decode([[token_id] for token_id in range(num_tokens)])
+        return [text.strip() for text in texts] + [""] * (vocab_size - num_tokens)
+    
+    def _find_space_marked(self) -> List[bool]:
+        """
+        Mark the vocabulary entries that carry the leading-space marker.
+        
+        Such a token is exactly what a replacement word tokenizes to
+        mid-sentence, so sentences can be rebuilt by splicing its ID.
+        
+        Returns:
+            Flag for each token ID up to the model's vocab size
+        """
+        vocab_size = len(self._vocab_texts)
+        num_tokens = min(vocab_size, len(self.tokenizer))
+        tokens = self.tokenizer.convert_ids_to_tokens(list(range(num_tokens)))
+        return [token.startswith("Ġ") for token in tokens] + [False] * (vocab_size - num_tokens)
+    
+    def _build_valid_mask(self) -> torch.Tensor:
+        """
+        Mark the vocabulary entries that pass the word-shape filters.
+        
+        Returns:
+            Bool tensor [vocab_size], True where the decoded token is a
+            usable replacement word
+        """
+        return torch.tensor(
+            [self._is_valid_word(text) for text in self._vocab_texts],
+            dtype=torch.bool
+        )
+    
+    def _is_valid_word(self, candidate: str) -> bool:
+        """
+        Check the word-shape filters that don't depend on the original word.
+        
+        Args:
+            candidate: Candidate word
+        
+        Returns:
+            True if candidate could be a replacement word
+        """
         # Must be a proper word (no empty, no special chars only)
         if not candidate or not candidate.replace("-", "").replace("'", "").isalpha():
             return False
@@ -161,22 +301,17 @@ class CandidateGenerator:
             constraints: Dictionary of constraints (POS, morphology, etc.)
         
         Returns:
-            Filtered list of candidates
+            The same candidates, with their text adjusted in place
         """
-        filtered = []
-        
         for candidate in candidates:
-            # Preserve capitalization
-            adjusted_text = self.preserve_capitalization(candidate.text, original)
+            # Preserve capitalization (in place, no new Candidate per word)
+            text = self.preserve_capitalization(candidate.text, original)
+            if text != candidate.text:
+                candidate.text = text
+                candidate.token_ids = None  # no longer the generated token
             
             # Additional constraint checks (POS, etc.) will be done later
             # by the linguistic constraints module
-            
-            filtered.append(Candidate(
-                text=adjusted_text,
-                log_prob=candidate.log_prob,
-                rank=candidate.rank
-            ))
         
-        return filtered
+        return candidates
 
@@ -4,9 +4,13 @@ from dataclasses import dataclass
 from typing import Optional
 
 
-@dataclass
+@dataclass(frozen=True)
 class FlowConfig:
-    """Configuration for text refinement thresholds and model settings."""
+    """
+    Configuration for text refinement thresholds and model settings.
+    
+    Instances are immutable; use dataclasses.replace() to derive variants.
+    """
     
     # Model selection
     roberta_model: str = "roberta-base"  # switch to base by default for lighter runtime
@@ -26,21 +30,42 @@ class FlowConfig:
     # Candidate generation
     top_k_candidates: int = 10  # candidates to consider per position (reduced for speed)
     max_edits_per_sentence: int = 2  # conservative edit budget
+    candidate_prune_slack: float = 3.0  # skip candidates whose log prob trails original + gain by more
+    screen_common_sentences: bool = False  # API: skip scoring sentences made only of common words (lossy)
     
     # Processing options
     use_nli_check: bool = False  # enable MNLI entailment check
+    nli_skip_similarity: float = 0.99  # skip NLI when SBERT cosine is at least this
     batch_size: int = 8  # for batched processing
     device: str = "cpu"  # or "cuda" if available
+    quantize: bool = True  # int8 dynamic quantization of RoBERTa, SBERT and NLI on CPU
+    compile: bool = False  # torch.compile RoBERTa, SBERT and NLI (slow start, faster steady state)
+    low_precision: bool = True  # bf16/fp16 forwards where supported (RoBERTa; SBERT/NLI weights on CUDA)
+    semantic_backend: str = "torch"  # or "onnx": SBERT/NLI as ONNX Runtime sessions (CPU only)
     
     # PLL computation
     pll_method: str = "word-l2r"  # "word-l2r" or "standard" for multi-piece
     
+    # Caching
+    cache_size: int = 4096  # entries per in-process LRU cache (0 disables)
+    cache_dir: Optional[str] = None  # persistent score and embedding caches across runs (None disables)
+    
     def __post_init__(self):
         """Validate configuration."""
         if self.min_entropy < 0:
             raise ValueError("min_entropy must be non-negative")
         if self.min_sbert_cosine < 0 or self.min_sbert_cosine > 1:
             raise ValueError("min_sbert_cosine must be in [0, 1]")
+        if self.nli_skip_similarity < 0 or self.nli_skip_similarity > 1:
+            raise ValueError("nli_skip_similarity must be in [0, 1]")
         if self.pll_window_size < 1:
             raise ValueError("pll_window_size must be positive")
+        if self.candidate_prune_slack < 0:
+            raise ValueError("candidate_prune_slack must be non-negative")
+        if self.cache_size < 0:
+            raise ValueError("cache_size must be non-negative")
+        if self.semantic_backend not in ("torch", "onnx"):
+            raise ValueError("semantic_backend must be 'torch' or 'onnx'")
+        if self.semantic_backend == "onnx" and self.device != "cpu":
+            raise ValueError("semantic_backend 'onnx' requires device 'cpu'")
 
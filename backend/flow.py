@@ -6,15 +6,32 @@ Main CLI interface for the Flow text refinement system.
 """
 
 import argparse
+import mmap
+import os
 import sys
-from typing import Optional
+from typing import Iterator, Optional
 
+# Only the lightweight config is imported here; the pipeline (torch,
+# transformers, spaCy) is imported in main() once there is work to do
 from .config import FlowConfig
-from .refinement_pipeline import RefinementPipeline
 
+# Input files larger than this are refined chunk by chunk from a memory map
+STREAM_MIN_BYTES = 1 << 20
 
-def main():
-    """Main entry point for Flow CLI."""
+# Target chunk size when streaming (well under spaCy's default max_length)
+STREAM_CHUNK_BYTES = 1 << 16
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    """
+    Build the Flow CLI argument parser.
+    
+    Returns:
+        Configured ArgumentParser (importable without running main)
+    """
+    # Threshold and model defaults come from FlowConfig so they can't drift
+    defaults = FlowConfig()
+    
     parser = argparse.ArgumentParser(
         description="Flow - Bidirectional Text Refinement using RoBERTa",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -65,59 +82,113 @@ Examples:
     # Model selection
     parser.add_argument(
         "--model",
-    default="roberta-base",
+        default=defaults.roberta_model,
         choices=["roberta-base", "roberta-large"],
-    help="RoBERTa model to use (default: roberta-base)"
+        help="RoBERTa model to use (default: %(default)s)"
     )
     
     parser.add_argument(
         "--device",
-        default="cpu",
+        default=defaults.device,
         choices=["cpu", "cuda"],
-        help="Device to run models on (default: cpu)"
+        help="Device to run models on (default: %(default)s)"
+    )
+    
+    # BooleanOptionalAction needs Python 3.9, so the pair is spelled out
+    parser.add_argument(
+        "--quantize",
+        dest="quantize",
+        action="store_true",
+        default=defaults.quantize,
+        help="Use int8 dynamic quantization for RoBERTa, SBERT and NLI on CPU (default: %(default)s)"
+    )
+    
+    parser.add_argument(
+        "--no-quantize",
+        dest="quantize",
+        action="store_false",
+        help="Run RoBERTa, SBERT and NLI in full precision on CPU"
+    )
+    
+    parser.add_argument(
+        "--low-precision",
+        dest="low_precision",
+        action="store_true",
+        default=defaults.low_precision,
+        help="Run RoBERTa in bfloat16/float16 where the hardware supports it (default: %(default)s)"
+    )
+    
+    parser.add_argument(
+        "--no-low-precision",
+        dest="low_precision",
+        action="store_false",
+        help="Run RoBERTa forwards in float32"
+    )
+    
+    parser.add_argument(
+        "--semantic-backend",
+        default=defaults.semantic_backend,
+        choices=["torch", "onnx"],
+        help="Backend for SBERT and NLI; onnx needs optimum[onnxruntime] and --device cpu (default: %(default)s)"
+    )
+    
+    parser.add_argument(
+        "--batch-positions",
+        dest="batch_positions",
+        action="store_true",
+        default=True,
+        help=f"Score masked positions together, {defaults.batch_size} per forward pass "
+             "(already the default; only --no-batch-positions changes behaviour)"
+    )
+    
+    parser.add_argument(
+        "--no-batch-positions",
+        dest="batch_positions",
+        action="store_false",
+        help="Run one forward pass per masked position (lowest peak memory)"
     )
     
     # Thresholds
     parser.add_argument(
         "--min-entropy",
         type=float,
-        default=4.0,
-        help="Minimum entropy threshold for flagging words (default: 4.0)"
+        default=defaults.min_entropy,
+        help="Minimum entropy threshold for flagging words (default: %(default)s)"
     )
     
     parser.add_argument(
         "--max-rank",
         type=int,
-        default=50,
-        help="Maximum original word rank for flagging (default: 50)"
+        default=defaults.max_original_rank,
+        help="Maximum original word rank for flagging (default: %(default)s)"
     )
     
     parser.add_argument(
         "--min-pll-gain",
         type=float,
-    default=2.0,
-    help="Minimum PLL gain required for accepting edits (default: 2.0)"
+        default=defaults.min_pll_gain,
+        help="Minimum PLL gain required for accepting edits (default: %(default)s)"
     )
     
     parser.add_argument(
         "--min-similarity",
         type=float,
-    default=0.97,
-    help="Minimum SBERT similarity required (default: 0.97)"
+        default=defaults.min_sbert_cosine,
+        help="Minimum SBERT similarity required (default: %(default)s)"
     )
     
     parser.add_argument(
         "--pll-window",
         type=int,
-        default=5,
-        help="PLL window size in tokens (default: 5)"
+        default=defaults.pll_window_size,
+        help="PLL window size in tokens (default: %(default)s)"
     )
     
     parser.add_argument(
         "--max-edits",
         type=int,
-        default=2,
-        help="Maximum edits per sentence (default: 2)"
+        default=defaults.max_edits_per_sentence,
+        help="Maximum edits per sentence (default: %(default)s)"
     )
     
     # Features
@@ -130,8 +201,21 @@ Examples:
     parser.add_argument(
         "--top-k",
         type=int,
-        default=20,
-        help="Number of candidate replacements to consider (default: 20)"
+        default=defaults.top_k_candidates,
+        help="Number of candidate replacements to consider (default: %(default)s)"
+    )
+    
+    parser.add_argument(
+        "--cache-dir",
+        default=defaults.cache_dir,
+        help="Directory for persistent score and embedding caches reused across runs (default: disabled)"
+    )
+    
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=None,
+        help="Intra-op CPU threads for PyTorch (default: $FLOW_THREADS or all cores)"
     )
     
     # Output
@@ -174,13 +258,90 @@ Examples:
         help="Number of replacement suggestions to show per highlighted word in highlight mode (default: 3)"
     )
     
+    return parser
+
+
+def _configure_cpu_threads(threads: Optional[int]) -> int:
+    """
+    Pin PyTorch's CPU thread pools before any model work starts.
+    
+    Args:
+        threads: Requested intra-op threads (None: $FLOW_THREADS, then all cores)
+    
+    Returns:
+        Number of intra-op threads in use
+    """
+    import torch
+    
+    if threads is None:
+        threads = int(os.environ.get("FLOW_THREADS", os.cpu_count() or 1))
+    threads = max(1, threads)
+    
+    torch.set_num_threads(threads)
+    try:
+        # Forward passes are issued one at a time, so inter-op parallelism
+        # only adds contention; this must run before any parallel work
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass
+    torch.backends.mkldnn.enabled = True
+    
+    return threads
+
+
+def _iter_file_chunks(path: str, chunk_bytes: int = STREAM_CHUNK_BYTES) -> Iterator[str]:
+    """
+    Read a UTF-8 file through a memory map in chunks ending at line breaks.
+    
+    Chunks end at the last paragraph break (or failing that, line break)
+    before chunk_bytes, so sentences are not split across chunks. Newline
+    bytes never occur inside multi-byte UTF-8 sequences, so every chunk
+    decodes on its own.
+    
+    Args:
+        path: File to read
+        chunk_bytes: Target chunk size in bytes
+    
+    Yields:
+        Decoded text chunks, in order
+    """
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        size = len(mm)
+        pos = 0
+        while pos < size:
+            end = min(pos + chunk_bytes, size)
+            if end < size:
+                cut = mm.rfind(b"\n\n", pos, end)
+                if cut <= pos:
+                    cut = mm.rfind(b"\n", pos, end)
+                if cut <= pos:
+                    # No break inside the window; extend to the next one
+                    cut = mm.find(b"\n", end)
+                end = size if cut == -1 else cut + 1
+            yield mm[pos:end].decode('utf-8')
+            pos = end
+
+
+def main():
+    """Main entry point for Flow CLI."""
+    parser = _build_parser()
     args = parser.parse_args()
     
-    # Get input text
+    apply_edits = args.apply_edits or args.interactive or args.show_candidates == 0
+    
+    # Get input text (large files in batch refinement mode are streamed)
+    stream_input = False
     if args.file:
         try:
-            with open(args.file, 'r', encoding='utf-8') as f:
-                text = f.read()
+            stream_input = (
+                apply_edits
+                and not args.highlight
+                and not args.interactive
+                and os.path.getsize(args.file) > STREAM_MIN_BYTES
+            )
+            if not stream_input:
+                with open(args.file, 'r', encoding='utf-8') as f:
+                    text = f.read()
         except Exception as e:
             print(f"Error reading file: {e}", file=sys.stderr)
             return 1
@@ -201,7 +362,12 @@ Examples:
         pll_window_size=args.pll_window,
         max_edits_per_sentence=args.max_edits,
         use_nli_check=args.use_nli,
-        top_k_candidates=args.top_k
+        top_k_candidates=args.top_k,
+        batch_size=FlowConfig.batch_size if args.batch_positions else 1,
+        quantize=args.quantize,
+        low_precision=args.low_precision,
+        semantic_backend=args.semantic_backend,
+        cache_dir=args.cache_dir
     )
     
     # Initialize pipeline
@@ -209,12 +375,18 @@ Examples:
     print(f"Configuration:")
     print(f"  Model: {config.roberta_model}")
     print(f"  Device: {config.device}")
+    print(f"  Quantized: {config.quantize and config.device == 'cpu'}")
     print(f"  Min entropy: {config.min_entropy} bits")
     print(f"  Min PLL gain: {config.min_pll_gain}")
     print(f"  Min similarity: {config.min_sbert_cosine}")
     print()
     
     try:
+        if config.device == "cpu":
+            threads = _configure_cpu_threads(args.threads)
+            print(f"Using {threads} CPU thread(s)")
+        
+        from .refinement_pipeline import RefinementPipeline
         pipeline = RefinementPipeline(config)
     except Exception as e:
         print(f"Error initializing pipeline: {e}", file=sys.stderr)
@@ -222,6 +394,9 @@ Examples:
         print("  python -m spacy download en_core_web_sm", file=sys.stderr)
         return 1
     
+    if stream_input:
+        return _refine_file_stream(pipeline, args.file, args.output)
+    
     # Process text
     if not args.highlight:
         print(f"\n{'='*70}")
@@ -234,7 +409,7 @@ Examples:
         if args.highlight:
             # Highlight mode - show words that need editing
             pipeline.highlight_clunky_words(text, show_top_replacements=args.highlight_suggestions)
-        elif args.apply_edits or args.interactive or args.show_candidates == 0:
+        elif apply_edits:
             # Normal refinement mode (apply edits)
             refined_text = pipeline.refine_text(text, interactive=args.interactive)
             
@@ -266,6 +441,47 @@ Examples:
     return 0
 
 
+def _refine_file_stream(pipeline, path: str, output: Optional[str]) -> int:
+    """
+    Refine a large file chunk by chunk, printing and writing as it goes.
+    
+    Args:
+        pipeline: Initialized RefinementPipeline
+        path: Input file
+        output: Optional file to write the refined text to
+    
+    Returns:
+        Process exit code
+    """
+    out = None
+    try:
+        if output:
+            out = open(output, 'w', encoding='utf-8')
+        
+        print(f"\n{'='*70}")
+        print(f"REFINED TEXT (streaming {path}):")
+        print(f"{'='*70}")
+        
+        for i, refined_chunk in enumerate(pipeline.refine_text_stream(_iter_file_chunks(path))):
+            print(refined_chunk)
+            if out is not None:
+                # Same " " separator refine_text uses between sentences
+                out.write((" " if i else "") + refined_chunk)
+        print()
+    except Exception as e:
+        print(f"Error refining text: {e}", file=sys.stderr)
+        import traceback
+        traceback.print_exc()
+        return 1
+    finally:
+        if out is not None:
+            out.close()
+    
+    if output:
+        print(f"Refined text written to {output}")
+    return 0
+
+
 if __name__ == "__main__":
     sys.exit(main())
 
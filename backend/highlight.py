@@ -6,10 +6,98 @@ This is a simplified interface to Flow's highlight functionality for quick check
 """
 
 import argparse
+import json
+import os
 import sys
+import urllib.error
+import urllib.request
+from typing import Optional
 
+# The pipeline (torch, transformers, spaCy) is imported in main() only when
+# no server is available
 from .config import FlowConfig
-from .refinement_pipeline import RefinementPipeline
+
+
+# Running API server to reuse (set FLOW_SERVER_URL="" to always load locally)
+DEFAULT_SERVER_URL = "http://localhost:8000"
+
+
+def highlight_via_server(
+    server_url: str,
+    text: str,
+    config: FlowConfig,
+    top_suggestions: int = 3
+) -> Optional[dict]:
+    """
+    Ask a running API server to highlight the text.
+    
+    Reusing the server's already-loaded models skips the multi-second
+    pipeline start-up.
+    
+    Args:
+        server_url: Base URL of the API server
+        text: Text to analyze
+        config: Thresholds to request
+        top_suggestions: Suggestions to return per word
+    
+    Returns:
+        The server's highlight response, or None if no server is reachable
+    """
+    try:
+        with urllib.request.urlopen(f"{server_url}/api/health", timeout=1) as response:
+            if not json.load(response).get("pipeline_loaded"):
+                return None
+    except (OSError, ValueError):
+        return None
+    
+    payload = json.dumps({
+        "text": text,
+        "min_entropy": config.min_entropy,
+        "max_rank": config.max_original_rank,
+        "top_suggestions": top_suggestions
+    }).encode("utf-8")
+    request = urllib.request.Request(
+        f"{server_url}/api/highlight",
+        data=payload,
+        headers={"Content-Type": "application/json"}
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            return json.load(response)
+    except (OSError, ValueError) as e:
+        print(f"Server request failed ({e}), analyzing locally", file=sys.stderr)
+        return None
+
+
+def print_server_results(result: dict):
+    """Print a highlight response from the API server."""
+    print(f"\n{'='*70}")
+    print("HIGHLIGHTED TEXT ANALYSIS")
+    print(f"{'='*70}")
+    print(f"Original text:")
+    print(f"{result['original_text']}")
+    print(f"\n{'='*70}")
+    print("Words likely to need editing:")
+    print(f"{'='*70}\n")
+    
+    for word in result["highlighted_words"]:
+        print(f"📝 '{word['word']}'")
+        print(f"   Entropy: {word['entropy']:.2f} bits | Rank: #{word['rank']} | Log-prob: {word['log_prob']:.2f}")
+        if word["flagged_reasons"]:
+            print(f"   Flagged: {', '.join(word['flagged_reasons'])}")
+        
+        print(f"   Top replacements:")
+        for i, suggestion in enumerate(word["suggestions"], 1):
+            status = "✓" if suggestion["passes_thresholds"] else " "
+            print(f"   {status} {i}. {suggestion['text']:15} → ΔLL= {suggestion['pll_gain']:+6.2f} | sim={suggestion['similarity']:.3f} | p= {suggestion['log_prob']:6.2f}")
+        print()
+    
+    print(f"{'='*70}")
+    if result["total_highlighted"] == 0:
+        print("✓ No issues detected in the text!")
+    else:
+        print(f"Summary: {result['total_highlighted']} word(s) highlighted across {result['sentence_count']} sentence(s)")
+    print(f"{'='*70}\n")
 
 
 def main():
@@ -44,10 +132,20 @@ def main():
         max_edits_per_sentence=5  # Show more potential issues
     )
     
+    # Reuse a running API server's loaded models when available
+    server_url = os.environ.get("FLOW_SERVER_URL", DEFAULT_SERVER_URL)
+    if server_url:
+        result = highlight_via_server(server_url, text, config, top_suggestions=3)
+        if result is not None:
+            print(f"Using Flow server at {server_url}")
+            print_server_results(result)
+            return
+    
     print("Initializing Flow highlight mode...")
     print(f"Using {config.roberta_model} for fast analysis\n")
     
     try:
+        from .refinement_pipeline import RefinementPipeline
         pipeline = RefinementPipeline(config)
     except Exception as e:
         print(f"Error initializing pipeline: {e}", file=sys.stderr)
@@ -1,69 +1,342 @@
 """Linguistic constraints checking using spaCy."""
 
-import spacy
-from typing import List, Dict, Optional, Set
+import sys
+from enum import IntEnum
+
+import numpy as np
+from spacy.attrs import IS_SPACE, ORTH
+from spacy.tokens import Doc
+from typing import List, Dict, FrozenSet, Optional, Set, Tuple
 from dataclasses import dataclass
 
+from .cache_utils import LRUCache
+from .loaders import get_sentencizer, get_spacy
+
+
+class POS(IntEnum):
+    """Universal POS tags; values double as indices for array lookups."""
+    ADJ = 0
+    ADP = 1
+    ADV = 2
+    AUX = 3
+    CCONJ = 4
+    DET = 5
+    INTJ = 6
+    NOUN = 7
+    NUM = 8
+    PART = 9
+    PRON = 10
+    PROPN = 11
+    PUNCT = 12
+    SCONJ = 13
+    SYM = 14
+    VERB = 15
+    X = 16
+    SPACE = 17
+
+
+# spaCy's coarse tag strings to POS members (unknown tags map to X)
+_POS_TO_ENUM = {pos.name: pos for pos in POS}
+
+# Morphological features that must agree between original and candidate,
+# with the Universal Dependencies values each one can take. Each feature is
+# packed into 4 bits of a uint32: 0 = absent, 1.. = value index + 1, and
+# MORPH_OTHER for values outside the table.
+MORPH_KEY_FEATURES = ("Number", "Tense", "Person", "Mood", "VerbForm")
+MORPH_VALUES = {
+    "Number": ("Sing", "Plur", "Dual", "Ptan", "Coll"),
+    "Tense": ("Past", "Pres", "Fut", "Imp", "Pqp"),
+    "Person": ("0", "1", "2", "3", "4"),
+    "Mood": ("Ind", "Imp", "Cnd", "Sub", "Pot", "Opt", "Jus", "Qot", "Adm", "Des", "Nec", "Int"),
+    "VerbForm": ("Fin", "Inf", "Part", "Ger", "Conv", "Gdv", "Sup", "Vnoun"),
+}
+MORPH_BITS = 4
+MORPH_OTHER = (1 << MORPH_BITS) - 1
+_MORPH_CODES = {
+    feature: {value: idx + 1 for idx, value in enumerate(values)}
+    for feature, values in MORPH_VALUES.items()
+}
+
+
+def pack_morph(morph: Dict[str, str]) -> int:
+    """
+    Pack the key morphological features into a 4-bit-per-feature bitfield.
+    
+    Args:
+        morph: Feature -> value dict
+    
+    Returns:
+        Packed features (feature i occupies bits 4i..4i+3)
+    """
+    bits = 0
+    for i, feature in enumerate(MORPH_KEY_FEATURES):
+        value = morph.get(feature)
+        if value:
+            code = _MORPH_CODES[feature].get(value, MORPH_OTHER)
+            bits |= code << (MORPH_BITS * i)
+    return bits
+
+
+# Lowest bit of every packed morph field
+_MORPH_FIELD_LOW_BITS = sum(1 << (MORPH_BITS * i) for i in range(len(MORPH_KEY_FEATURES)))
+
+
+def morph_present_mask(bits: np.ndarray) -> np.ndarray:
+    """
+    Expand packed morph bitfields to masks of their non-empty fields.
+    
+    Args:
+        bits: Packed features (uint32 array or scalar)
+    
+    Returns:
+        Same shape, with all 4 bits set for every field that is present
+    """
+    # OR each field's bits down into its lowest bit, then widen to the field
+    folded = bits | (bits >> 1) | (bits >> 2) | (bits >> 3)
+    return (folded & _MORPH_FIELD_LOW_BITS) * MORPH_OTHER
+
+
+def morph_compatible_mask(original_bits: int, candidate_bits: np.ndarray) -> np.ndarray:
+    """
+    Check packed morphology of many candidates against the original at once.
+    
+    A field only has to match when both sides have it, so all fields of a
+    candidate are compared in one XOR-and-mask on its packed word.
+    
+    Args:
+        original_bits: Packed features of the original word
+        candidate_bits: Packed features of the candidates (uint32 array)
+    
+    Returns:
+        Bool array, True where all shared features agree
+    """
+    original = np.uint32(original_bits)
+    shared = morph_present_mask(original) & morph_present_mask(candidate_bits)
+    return ((original ^ candidate_bits) & shared) == 0
+
 
-@dataclass
+@dataclass(frozen=True)
 class WordInfo:
-    """Linguistic information about a word."""
+    """
+    Linguistic information about a word.
+    
+    Immutable and hashable, so instances can be shared through caches.
+    """
+    # Declared by hand: dataclass(slots=True) needs Python 3.10
+    __slots__ = ("text", "pos", "tag", "morph", "is_proper", "is_numeric", "morph_bits")
+    
     text: str
-    pos: str  # coarse POS tag
-    tag: str  # fine-grained POS tag
-    morph: Dict[str, str]  # morphological features
+    pos: POS  # coarse POS tag
+    tag: str  # fine-grained POS tag (interned)
+    morph: FrozenSet[Tuple[str, str]]  # morphological (feature, value) pairs
     is_proper: bool  # proper noun
     is_numeric: bool  # number
+    morph_bits: int  # key features packed by pack_morph
+    
+    @property
+    def morph_dict(self) -> Dict[str, str]:
+        """Morphological features as a feature -> value dict."""
+        return dict(self.morph)
 
 
 class LinguisticConstraints:
     """Check and enforce linguistic constraints."""
     
-    def __init__(self, model_name: str = "en_core_web_sm"):
+    # Components the constraints rely on: English pipelines get POS tags and
+    # morphology from the tagger plus attribute_ruler (sentence boundaries
+    # come from the separate rule-based sentencizer)
+    REQUIRED_COMPONENTS = ("tagger", "attribute_ruler")
+    
+    # Components skipped at load time unless strict_parse is set
+    UNUSED_COMPONENTS = ("parser", "ner", "lemmatizer")
+    
+    # Components not needed to tag isolated candidate words
+    WORD_DISABLED_PIPES = ("parser", "ner", "lemmatizer", "senter")
+    
+    def __init__(
+        self,
+        model_name: str = "en_core_web_sm",
+        cache_size: int = 4096,
+        word_info_cache_size: int = 20000,
+        strict_parse: bool = False
+    ):
         """
         Initialize linguistic constraints checker.
         
         Args:
             model_name: spaCy model name
+            cache_size: Entries kept in the parse and word extraction caches
+            word_info_cache_size: Entries kept in the isolated word info cache
+                (candidate vocabulary is small, so this rarely evicts)
+            strict_parse: Keep the full pipeline (dependency parse, NER and
+                lemmas) instead of only the components in REQUIRED_COMPONENTS
         """
-        self.nlp = spacy.load(model_name)
+        if strict_parse:
+            self.nlp = get_spacy(model_name)
+        else:
+            self.nlp = get_spacy(model_name, disable=self.UNUSED_COMPONENTS)
+        
+        missing = [name for name in self.REQUIRED_COMPONENTS if name not in self.nlp.pipe_names]
+        if missing:
+            raise ValueError(
+                f"spaCy model {model_name!r} lacks required components: {', '.join(missing)}"
+            )
+        
+        # Pipes run on candidate words, resolved once (running them by hand
+        # avoids toggling the shared pipeline, which other threads may use)
+        self._word_pipes = [
+            (name, proc) for name, proc in self.nlp.pipeline
+            if name not in self.WORD_DISABLED_PIPES
+        ]
+        
+        # Ordered pairs of distinct POS tags that may substitute for each other
+        compatible_groups = [
+            {POS.NOUN, POS.PROPN},  # nouns can sometimes substitute
+            {POS.ADJ, POS.ADV},  # adjectives/adverbs sometimes interchangeable
+        ]
+        self._pos_compat_pairs = frozenset(
+            (pos1, pos2)
+            for group in compatible_groups
+            for pos1 in group
+            for pos2 in group
+        )
+        
+        # Morphological features that must agree between original and candidate
+        self._key_features = MORPH_KEY_FEATURES
+        
+        # The same POS rules as a lookup table over POS values
+        self._pos_compat_table = np.eye(len(POS), dtype=bool)
+        for pos1, pos2 in self._pos_compat_pairs:
+            self._pos_compat_table[pos1, pos2] = True
+        
+        # Word extraction needs token boundaries only
+        self._tokenizer = self.nlp.tokenizer
+        
+        # Sentence splitting needs punctuation rules only, not the tagger
+        self._sentencizer = get_sentencizer(self.nlp.lang)
+        
+        self._doc_cache = LRUCache(cache_size)
+        self._words_cache = LRUCache(cache_size)
+        self._analysis_cache = LRUCache(cache_size)
+        self._context_cache = LRUCache(cache_size)
+        self._filter_cache = LRUCache(cache_size)
+        self._word_info_cache = LRUCache(word_info_cache_size)
+    
+    def parse(self, text: str) -> Doc:
+        """
+        Run the spaCy pipeline on text, reusing recent parses.
+        
+        Args:
+            text: Text to parse
+        
+        Returns:
+            spaCy Doc (shared between callers; do not modify)
+        """
+        return self._doc_cache.get_or_compute(text, lambda: self.nlp(text))
+    
+    def split_sentences(self, text: str) -> Doc:
+        """
+        Find sentence boundaries with the rule-based sentencizer.
+        
+        Much cheaper than parse() on long documents, since no statistical
+        component runs.
+        
+        Args:
+            text: Text to split
+        
+        Returns:
+            spaCy Doc with sentence boundaries set (no tags or morphology)
+        """
+        return self._sentencizer(text)
     
     def analyze_text(self, text: str) -> List[WordInfo]:
         """
         Analyze text and extract linguistic features.
         
+        Results are cached on the text.
+        
         Args:
             text: Text to analyze
         
         Returns:
             List of WordInfo for each token
         """
-        doc = self.nlp(text)
+        infos = self._analysis_cache.get_or_compute(
+            text,
+            lambda: tuple(
+                self._token_info(token)
+                for token in self.parse(text)
+                # Skip punctuation and whitespace
+                if not (token.is_punct or token.is_space)
+            )
+        )
+        return list(infos)
+    
+    def context_word_infos(self, text: str) -> Dict[str, WordInfo]:
+        """
+        Map each word of a sentence to its in-context WordInfo.
         
-        word_infos = []
-        for token in doc:
-            # Skip punctuation and whitespace
-            if token.is_punct or token.is_space:
-                continue
-            
-            # Extract morphological features
-            morph = {}
-            if token.morph:
-                for feature in token.morph:
-                    key_value = str(feature).split("=")
-                    if len(key_value) == 2:
-                        morph[key_value[0]] = key_value[1]
-            
-            word_infos.append(WordInfo(
-                text=token.text,
-                pos=token.pos_,
-                tag=token.tag_,
-                morph=morph,
-                is_proper=token.pos_ == "PROPN",
-                is_numeric=token.like_num or token.is_digit
-            ))
+        Callers filtering several words of one sentence should build this
+        once and pass it to word_info_in_context. Results are cached on the
+        text.
+        
+        Args:
+            text: Sentence text
+        
+        Returns:
+            Lowercased word -> WordInfo of its first occurrence
+            (shared between callers; do not modify)
+        """
+        def build() -> Dict[str, WordInfo]:
+            context_infos = {}
+            for info in self.analyze_text(text):
+                context_infos.setdefault(info.text.lower(), info)
+            return context_infos
+        
+        return self._context_cache.get_or_compute(text, build)
+    
+    def word_info_in_context(
+        self,
+        word: str,
+        context_infos: Dict[str, WordInfo]
+    ) -> WordInfo:
+        """
+        Look up a word's in-context WordInfo, falling back to isolation.
+        
+        Args:
+            word: Word to look up
+            context_infos: Result of context_word_infos for the sentence
+        
+        Returns:
+            WordInfo object
+        """
+        info = context_infos.get(word.lower())
+        return info if info is not None else self.get_word_info(word)
+    
+    def _token_info(self, token) -> WordInfo:
+        """
+        Build the WordInfo for a single spaCy token.
+        
+        Args:
+            token: spaCy Token
+        
+        Returns:
+            WordInfo object
+        """
+        # Morphological features straight from spaCy's MorphAnalysis
+        morph = token.morph.to_dict() if token.has_morph() else {}
+        
+        pos = _POS_TO_ENUM.get(token.pos_, POS.X)
         
-        return word_infos
+        return WordInfo(
+            text=token.text,
+            pos=pos,
+            tag=sys.intern(token.tag_),
+            morph=frozenset(morph.items()),
+            is_proper=pos == POS.PROPN,
+            is_numeric=token.like_num or token.is_digit,
+            morph_bits=pack_morph(morph)
+        )
     
     def get_word_info(self, word: str) -> WordInfo:
         """
@@ -75,15 +348,55 @@ class LinguisticConstraints:
         Returns:
             WordInfo object
         """
-        infos = self.analyze_text(word)
-        return infos[0] if infos else WordInfo(
-            text=word,
-            pos="X",
-            tag="X",
-            morph={},
-            is_proper=False,
-            is_numeric=False
-        )
+        return self.get_word_infos([word])[0]
+    
+    def get_word_infos(self, words: List[str]) -> List[WordInfo]:
+        """
+        Get linguistic information for several isolated words at once.
+        
+        Results are cached per word; the remaining words are tagged together
+        with each component's batched pipe(), skipping the components that
+        only matter for full sentences.
+        
+        Args:
+            words: Words to analyze
+        
+        Returns:
+            WordInfo object for each word
+        """
+        word_infos = [self._word_info_cache.get(word) for word in words]
+        missing = list(dict.fromkeys(
+            word for word, info in zip(words, word_infos) if info is None
+        ))
+        if not missing:
+            return word_infos
+        
+        docs = [self.nlp.make_doc(word) for word in missing]
+        for _, proc in self._word_pipes:
+            docs = list(proc.pipe(docs, batch_size=64))
+        
+        computed = {}
+        for word, doc in zip(missing, docs):
+            token = next(
+                (t for t in doc if not (t.is_punct or t.is_space)),
+                None
+            )
+            info = self._token_info(token) if token is not None else WordInfo(
+                text=word,
+                pos=POS.X,
+                tag="X",
+                morph=frozenset(),
+                is_proper=False,
+                is_numeric=False,
+                morph_bits=0
+            )
+            self._word_info_cache.put(word, info)
+            computed[word] = info
+        
+        return [
+            info if info is not None else computed[word]
+            for word, info in zip(words, word_infos)
+        ]
     
     def is_compatible(
         self,
@@ -116,11 +429,58 @@ class LinguisticConstraints:
         
         # Check morphological features if strict
         if strict_morph:
-            return self._morph_compatible(original_info.morph, candidate_info.morph)
+            return self._morph_compatible(original_info.morph_dict, candidate_info.morph_dict)
         
         return True
     
-    def _pos_compatible(self, pos1: str, pos2: str) -> bool:
+    def is_compatible_batch(
+        self,
+        original_info: WordInfo,
+        candidate_infos: List[WordInfo],
+        strict_morph: bool = True
+    ) -> np.ndarray:
+        """
+        Vectorized is_compatible over many candidates.
+        
+        Candidate POS indices, flags and packed morphology are gathered into
+        arrays and checked with table lookups and mask operations instead of
+        per-candidate Python comparisons.
+        
+        Args:
+            original_info: Original word info
+            candidate_infos: Candidate word infos
+            strict_morph: Whether to enforce strict morphology matching
+        
+        Returns:
+            Bool array, True where the candidate is compatible
+        """
+        n = len(candidate_infos)
+        
+        # Don't replace proper nouns or numbers
+        if original_info.is_proper or original_info.is_numeric:
+            return np.zeros(n, dtype=bool)
+        
+        pos_ids = np.fromiter((info.pos for info in candidate_infos), dtype=np.int8, count=n)
+        excluded = np.fromiter(
+            (info.is_proper or info.is_numeric for info in candidate_infos),
+            dtype=bool,
+            count=n
+        )
+        
+        # Coarse POS compatibility, and no proper nouns or numbers as replacements
+        compatible = self._pos_compat_table[original_info.pos, pos_ids] & ~excluded
+        
+        if strict_morph:
+            morph_bits = np.fromiter(
+                (info.morph_bits for info in candidate_infos),
+                dtype=np.uint32,
+                count=n
+            )
+            compatible &= morph_compatible_mask(original_info.morph_bits, morph_bits)
+        
+        return compatible
+    
+    def _pos_compatible(self, pos1: POS, pos2: POS) -> bool:
         """
         Check if two POS tags are compatible.
         
@@ -131,21 +491,8 @@ class LinguisticConstraints:
         Returns:
             True if compatible
         """
-        # Exact match is always compatible
-        if pos1 == pos2:
-            return True
-        
-        # Define compatible POS groups
-        compatible_groups = [
-            {"NOUN", "PROPN"},  # nouns can sometimes substitute
-            {"ADJ", "ADV"},  # adjectives/adverbs sometimes interchangeable
-        ]
-        
-        for group in compatible_groups:
-            if pos1 in group and pos2 in group:
-                return True
-        
-        return False
+        # Exact match is always compatible; otherwise both must share a group
+        return pos1 == pos2 or (pos1, pos2) in self._pos_compat_pairs
     
     def _morph_compatible(self, morph1: Dict[str, str], morph2: Dict[str, str]) -> bool:
         """
@@ -164,10 +511,7 @@ class LinguisticConstraints:
         Returns:
             True if compatible
         """
-        # Key features that should match
-        key_features = ["Number", "Tense", "Person", "Mood", "VerbForm"]
-        
-        for feature in key_features:
+        for feature in self._key_features:
             val1 = morph1.get(feature)
             val2 = morph2.get(feature)
             
@@ -187,6 +531,10 @@ class LinguisticConstraints:
         """
         Filter candidates based on linguistic constraints.
         
+        Locates original_word in original_context first; callers that
+        already have the word's WordInfo should use
+        filter_candidates_with_info.
+        
         Args:
             original_word: Original word
             candidates: List of candidate words
@@ -196,40 +544,99 @@ class LinguisticConstraints:
         Returns:
             Filtered list of candidates
         """
-        # Get original word info in context
-        context_infos = self.analyze_text(original_context)
-        
-        # Find the original word in context
-        original_info = None
-        for info in context_infos:
-            if info.text.lower() == original_word.lower():
-                original_info = info
-                break
+        original_info = self.word_info_in_context(
+            original_word,
+            self.context_word_infos(original_context)
+        )
+        return self.filter_candidates_with_info(original_info, candidates, strict)
+    
+    def filter_candidates_with_info(
+        self,
+        original_info: WordInfo,
+        candidates: List[str],
+        strict: bool = True
+    ) -> List[str]:
+        """
+        Filter candidates against the original word's linguistic info.
         
-        if not original_info:
-            # Fallback: analyze word in isolation
-            original_info = self.get_word_info(original_word)
+        Results are cached on (original_info, candidates, strict).
         
-        # Filter candidates
-        filtered = []
-        for candidate in candidates:
-            candidate_info = self.get_word_info(candidate)
-            
-            if self.is_compatible(original_info, candidate_info, strict_morph=strict):
-                filtered.append(candidate)
+        Args:
+            original_info: WordInfo of the original word in context
+            candidates: List of candidate words
+            strict: Whether to use strict morphology matching
         
-        return filtered
+        Returns:
+            Filtered list of candidates
+        """
+        filtered = self._filter_cache.get_or_compute(
+            (original_info, tuple(candidates), strict),
+            lambda: self._filter_candidates(original_info, candidates, strict)
+        )
+        return list(filtered)
+    
+    def _filter_candidates(
+        self,
+        original_info: WordInfo,
+        candidates: List[str],
+        strict: bool
+    ) -> List[str]:
+        """Filter candidates (uncached)."""
+        # Filter candidates, tagging them all in one batch
+        candidate_infos = self.get_word_infos(candidates)
+        compatible = self.is_compatible_batch(original_info, candidate_infos, strict_morph=strict)
+        return [
+            candidate
+            for candidate, keep in zip(candidates, compatible.tolist())
+            if keep
+        ]
     
     def extract_words(self, text: str) -> List[str]:
         """
         Extract words from text (for tokenization).
         
+        Only the tokenizer runs; word boundaries don't depend on the
+        statistical components. Results are cached on the text.
+        
         Args:
             text: Text to tokenize
         
         Returns:
             List of words
         """
-        doc = self.nlp(text)
-        return [token.text for token in doc if not token.is_space]
-
+        return self.extract_words_batch([text])[0]
+    
+    def extract_words_batch(self, texts: List[str]) -> List[List[str]]:
+        """
+        Extract words from several texts, tokenizing uncached ones together.
+        
+        Args:
+            texts: Texts to tokenize
+        
+        Returns:
+            List of words for each text
+        """
+        cached = [self._words_cache.get(text) for text in texts]
+        missing = list(dict.fromkeys(
+            text for text, words in zip(texts, cached) if words is None
+        ))
+        
+        computed = {}
+        for text, doc in zip(missing, self._tokenizer.pipe(missing)):
+            words = self._doc_words(doc)
+            self._words_cache.put(text, words)
+            computed[text] = words
+        
+        return [
+            list(words if words is not None else computed[text])
+            for text, words in zip(texts, cached)
+        ]
+    
+    def _doc_words(self, doc: Doc) -> Tuple[str, ...]:
+        """Extract non-whitespace token texts from the token attribute array."""
+        strings = self.nlp.vocab.strings
+        return tuple(
+            strings[int(orth)]
+            for orth, is_space in doc.to_array([ORTH, IS_SPACE])
+            if not is_space
+        )
@@ -0,0 +1,86 @@
+"""Shared loaders so each tokenizer and spaCy pipeline is loaded once per process."""
+
+import functools
+import threading
+from typing import Tuple
+
+import spacy
+from transformers import AutoTokenizer
+
+# Models are loaded from a thread pool at startup; serialize first loads so
+# concurrent callers don't each build their own copy
+_tokenizer_lock = threading.Lock()
+_spacy_lock = threading.Lock()
+_sentencizer_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def _load_tokenizer(model_name: str):
+    return AutoTokenizer.from_pretrained(model_name, use_fast=True)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_spacy(model_name: str, disable: Tuple[str, ...], enable: Tuple[str, ...]):
+    nlp = spacy.load(model_name, disable=list(disable))
+    for name in enable:
+        if name in nlp.disabled:
+            nlp.enable_pipe(name)
+    return nlp
+
+
+@functools.lru_cache(maxsize=None)
+def _load_sentencizer(lang: str):
+    nlp = spacy.blank(lang)
+    nlp.add_pipe("sentencizer")
+    return nlp
+
+
+def get_tokenizer(model_name: str):
+    """
+    Get the shared fast tokenizer for a HuggingFace model.
+
+    Args:
+        model_name: HuggingFace model name
+
+    Returns:
+        Tokenizer instance (shared between callers; do not modify)
+    """
+    with _tokenizer_lock:
+        return _load_tokenizer(model_name)
+
+
+def get_spacy(
+    model_name: str,
+    disable: Tuple[str, ...] = (),
+    enable: Tuple[str, ...] = ()
+):
+    """
+    Get the shared spaCy pipeline for a model and component selection.
+
+    Args:
+        model_name: spaCy model name
+        disable: Components to disable at load time
+        enable: Components disabled by default that should be turned on
+
+    Returns:
+        spaCy Language instance (shared between callers; do not modify)
+    """
+    with _spacy_lock:
+        return _load_spacy(model_name, tuple(disable), tuple(enable))
+
+
+def get_sentencizer(lang: str = "en"):
+    """
+    Get the shared rule-based sentence splitter for a language.
+
+    A blank pipeline with only the punctuation-based sentencizer, for
+    when sentence boundaries are all that is needed.
+
+    Args:
+        lang: spaCy language code
+
+    Returns:
+        spaCy Language instance (shared between callers; do not modify)
+    """
+    with _sentencizer_lock:
+        return _load_sentencizer(lang)
@@ -1,20 +1,33 @@
 """Main refinement pipeline for text improvement."""
 
-from typing import List, Dict, Tuple, Optional, TYPE_CHECKING
+from typing import List, Dict, Iterable, Iterator, Tuple, Optional, TYPE_CHECKING
 from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
 import re
+import sys
+import numpy as np
+import torch
 
 from .config import FlowConfig
-from .scorer import BidirectionalScorer, WordScore
+from .scorer import BidirectionalScorer, ScoreArrays, WordScore
 from .candidate_generator import CandidateGenerator, Candidate
 from .semantic_checker import SemanticChecker
 from .linguistic_constraints import LinguisticConstraints
 from .tokenizer_utils import TokenizerAligner
+from .cache_utils import LRUCache
 
 if TYPE_CHECKING:
     from .tokenizer_utils import WordAlignment
 
 
+# Punctuation tokens that are never flagged or replaced
+PUNCTUATION = frozenset({'.', ',', '!', '?', ';', ':', '"', "'", '(', ')'})
+
+# Composite quality weights for show_candidates_for_text:
+# (original entropy, PLL gain, similarity, candidate log prob)
+QUALITY_WEIGHTS = np.array([0.3, 2.0, 10.0, 0.1])
+
+
 @dataclass
 class Edit:
     """Represents a proposed edit."""
@@ -52,29 +65,61 @@ class RefinementPipeline:
         # Initialize components
         print(f"Loading models (this may take a moment)...")
         
-        self.scorer = BidirectionalScorer(
-            model_name=config.roberta_model,
-            device=config.device,
-            pll_method=config.pll_method
-        )
+        # Load the independent models concurrently to overlap disk I/O
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            scorer = executor.submit(
+                BidirectionalScorer,
+                model_name=config.roberta_model,
+                device=config.device,
+                pll_method=config.pll_method,
+                batch_size=config.batch_size,
+                cache_size=config.cache_size,
+                quantize=config.quantize,
+                cache_dir=config.cache_dir,
+                compile=config.compile,
+                low_precision=config.low_precision
+            )
+            semantic_checker = executor.submit(
+                SemanticChecker,
+                sbert_model=config.sbert_model,
+                nli_model=config.nli_model if config.use_nli_check else None,
+                device=config.device,
+                cache_size=config.cache_size,
+                low_precision=config.low_precision,
+                compile=config.compile,
+                backend=config.semantic_backend,
+                quantize=config.quantize,
+                cache_dir=config.cache_dir
+            )
+            constraints = executor.submit(
+                LinguisticConstraints,
+                model_name=config.spacy_model,
+                cache_size=config.cache_size
+            )
+            
+            self.scorer = scorer.result()
+            self.semantic_checker = semantic_checker.result()
+            self.constraints = constraints.result()
         
         self.generator = CandidateGenerator(
             scorer=self.scorer,
             top_k=config.top_k_candidates
         )
         
-        self.semantic_checker = SemanticChecker(
-            sbert_model=config.sbert_model,
-            nli_model=config.nli_model if config.use_nli_check else None,
-            device=config.device
-        )
-        
-        self.constraints = LinguisticConstraints(
-            model_name=config.spacy_model
-        )
+        # Inference only: never track gradients for model weights (the
+        # semantic checker freezes its own torch models, if it has any)
+        torch.set_grad_enabled(False)
+        self.scorer.model.requires_grad_(False)
         
         self.aligner = self.scorer.aligner
         
+        self._sentence_cache = LRUCache(config.cache_size)
+        
+        # Windowed PLLs of sentences being edited, reused across candidates
+        # (keys include the token IDs, so an applied edit naturally misses;
+        # SBERT embeddings are cached by the semantic checker)
+        self._orig_pll_cache = LRUCache(config.cache_size)
+        
         print("All models loaded successfully!")
     
     def refine_sentence(
@@ -92,19 +137,51 @@ class RefinementPipeline:
         Returns:
             RefinementResult object
         """
+        return self.refine_sentences_batch([sentence], interactive=interactive)[0]
+    
+    def refine_sentences_batch(
+        self,
+        sentences: List[str],
+        interactive: bool = False
+    ) -> List[RefinementResult]:
+        """
+        Refine several sentences, scoring them all in shared forward passes.
+        
+        Args:
+            sentences: Sentences to refine
+            interactive: If True, prompt for user approval of edits
+        
+        Returns:
+            RefinementResult for each sentence
+        """
         # Step 1: Extract words using spaCy
-        words = self.constraints.extract_words(sentence)
-        
-        # Step 2: Score all words
-        scores = self.scorer.score_sentence(
-            sentence,
-            words,
-            min_entropy=self.config.min_entropy,
-            max_rank=self.config.max_original_rank
+        sentence_words = self.constraints.extract_words_batch(sentences)
+        
+        # Step 2: Score all words of all sentences together
+        all_scores = self.scorer.score_sentence_arrays(
+            list(zip(sentences, sentence_words))
         )
         
-        # Step 3: Identify clunky words
-        clunky_words = [s for s in scores if s.is_clunky]
+        return [
+            self._refine_scored(sentence, words, scores, interactive)
+            for sentence, words, scores in zip(sentences, sentence_words, all_scores)
+        ]
+    
+    def _refine_scored(
+        self,
+        sentence: str,
+        words: List[str],
+        score_arrays: ScoreArrays,
+        interactive: bool
+    ) -> RefinementResult:
+        """Apply edits to an already-scored sentence."""
+        # Step 3: Identify clunky words (one vectorized threshold check)
+        is_clunky = score_arrays.clunky_mask(
+            self.config.min_entropy,
+            self.config.max_original_rank
+        )
+        scores = score_arrays.word_scores(is_clunky)
+        clunky_words = [scores[i] for i in np.flatnonzero(is_clunky).tolist()]
         
         if not clunky_words:
             return RefinementResult(
@@ -117,6 +194,11 @@ class RefinementPipeline:
         # Step 4: Process each clunky word (greedy left-to-right)
         current_text = sentence
         current_words = words.copy()
+        context_infos = self.constraints.context_word_infos(current_text)
+        input_ids, alignment_by_idx = self._encode_with_alignment_index(
+            current_text,
+            current_words
+        )
         edits = []
         edit_count = 0
         
@@ -125,29 +207,13 @@ class RefinementPipeline:
             if edit_count >= self.config.max_edits_per_sentence:
                 break
             
-            # Get word alignment in current text
-            alignments = self.aligner.align_words_to_tokens(
-                current_text,
-                current_words
-            )
-            
             # Find alignment for this word
-            alignment = None
-            for a in alignments:
-                if a.word_idx == score.word_idx:
-                    alignment = a
-                    break
+            alignment = alignment_by_idx.get(score.word_idx)
             
             if not alignment:
                 continue
             
             # Generate candidates
-            encoding = self.aligner.tokenizer(
-                current_text,
-                add_special_tokens=True
-            )
-            input_ids = encoding['input_ids']
-            
             candidates = self.generator.generate_candidates(
                 input_ids,
                 alignment,
@@ -159,15 +225,15 @@ class RefinementPipeline:
             
             # Filter by linguistic constraints
             candidate_texts = [c.text for c in candidates]
-            filtered_texts = self.constraints.filter_candidates(
-                score.word_text,
+            filtered_texts = self.constraints.filter_candidates_with_info(
+                self.constraints.word_info_in_context(score.word_text, context_infos),
                 candidate_texts,
-                current_text,
                 strict=True
             )
             
+            filtered_set = set(filtered_texts)
             filtered_candidates = [
-                c for c in candidates if c.text in filtered_texts
+                c for c in candidates if c.text in filtered_set
             ]
             
             if not filtered_candidates:
@@ -197,6 +263,11 @@ class RefinementPipeline:
                 alignment,
                 best_edit.replacement
             )
+            context_infos = self.constraints.context_word_infos(current_text)
+            input_ids, alignment_by_idx = self._encode_with_alignment_index(
+                current_text,
+                current_words
+            )
             
             edits.append(best_edit)
             edit_count += 1
@@ -208,6 +279,24 @@ class RefinementPipeline:
             scores=scores
         )
     
+    def _encode_with_alignment_index(
+        self,
+        text: str,
+        words: List[str]
+    ) -> Tuple[List[int], Dict[int, 'WordAlignment']]:
+        """
+        Encode a sentence and index its word alignments by word position.
+        
+        Args:
+            text: Sentence text
+            words: Words of the sentence
+        
+        Returns:
+            Tuple of (token IDs, alignment for each aligned word index)
+        """
+        input_ids, alignments = self.aligner.encode_and_align(text, words)
+        return input_ids, {a.word_idx: a for a in alignments}
+    
     def _find_best_edit(
         self,
         current_text: str,
@@ -229,66 +318,81 @@ class RefinementPipeline:
         Returns:
             Best Edit if found, None otherwise
         """
-        # Compute original windowed PLL
-        original_pll = self.scorer.compute_windowed_pll(
-            input_ids,
-            alignment.token_start,
-            window_size=self.config.pll_window_size
-        )
-        
         best_candidate = None
         best_pll_gain = -float('inf')
         best_similarity = 0.0
         alternatives = []
         
-        for candidate in candidates[:5]:  # Limit to top 5 for speed
-            # Reconstruct sentence with candidate
-            new_text, new_ids = self.aligner.reconstruct_sentence(
-                input_ids,
-                candidate.text,
-                alignment
-            )
-            
-            # Compute new PLL
-            # Need to adjust position if token count changed
-            token_diff = len(new_ids) - len(input_ids)
-            new_pos = alignment.token_start
-            
-            new_pll = self.scorer.compute_windowed_pll(
-                new_ids,
-                new_pos,
-                window_size=self.config.pll_window_size
-            )
-            
+        # Never spend a forward pass on the original word or on a surface
+        # form already being evaluated
+        original_lower = original_score.word_text.strip().lower()
+        seen = {original_lower}
+        unique_candidates = []
+        for candidate in candidates:
+            candidate_lower = candidate.text.strip().lower()
+            if candidate_lower not in seen:
+                seen.add(candidate_lower)
+                unique_candidates.append(candidate)
+        
+        candidates = unique_candidates[:5]  # Limit to top 5 for speed
+        if not candidates:
+            return None
+        
+        # Token IDs of the sentence with each candidate; text is decoded
+        # only for candidates that survive the PLL threshold
+        candidate_ids = self.aligner.reconstruct_ids_batch(
+            input_ids,
+            [candidate.text for candidate in candidates],
+            alignment,
+            [candidate.token_ids for candidate in candidates]
+        )
+        
+        # Windowed PLL of the original and every candidate in one batch
+        # (the window stays centered on the word's first token)
+        original_pll, new_plls = self._windowed_plls(input_ids, candidate_ids, alignment)
+        
+        gaining = []  # (candidate, new_ids, pll_gain)
+        for candidate, new_ids, new_pll in zip(candidates, candidate_ids, new_plls):
             pll_gain = new_pll - original_pll
             
-            # Compute semantic similarity
-            similarity = self.semantic_checker.compute_similarity(
-                current_text,
-                new_text
-            )
-            
             # Store for alternatives list
             alternatives.append((candidate.text, pll_gain))
             
             # Check thresholds
-            if pll_gain < self.config.min_pll_gain:
-                continue
-            
-            if similarity < self.config.min_sbert_cosine:
-                continue
-            
-            # Optional NLI check
-            if self.config.use_nli_check:
-                is_preserved, details = self.semantic_checker.is_semantically_preserved(
-                    current_text,
-                    new_text,
-                    min_similarity=self.config.min_sbert_cosine,
-                    allow_contradiction=False
-                )
-                if not is_preserved:
-                    continue
-            
+            if pll_gain >= self.config.min_pll_gain:
+                gaining.append((candidate, new_ids, pll_gain))
+        
+        # Compute semantic similarity for the survivors in one SBERT batch
+        new_texts = [self.aligner.reconstruct_text(new_ids) for _, new_ids, _ in gaining]
+        similarities = self.semantic_checker.batch_compute_similarity(current_text, new_texts)
+        
+        passing = []  # (candidate, new_text, similarity, pll_gain)
+        for (candidate, _, pll_gain), new_text, similarity in zip(
+            gaining, new_texts, similarities
+        ):
+            if similarity >= self.config.min_sbert_cosine:
+                passing.append((candidate, new_text, similarity, pll_gain))
+        
+        # Optional NLI check, one batch for all survivors (a near-identical
+        # embedding is trusted without it)
+        if self.config.use_nli_check and passing:
+            needs_nli = [
+                i for i, (_, _, similarity, _) in enumerate(passing)
+                if similarity < self.config.nli_skip_similarity
+            ]
+            verdicts = self.semantic_checker.batch_is_semantically_preserved(
+                current_text,
+                [passing[i][1] for i in needs_nli],
+                min_similarity=self.config.min_sbert_cosine,
+                allow_contradiction=False,
+                similarities=[passing[i][2] for i in needs_nli]
+            )
+            rejected = {
+                i for i, (is_preserved, _) in zip(needs_nli, verdicts)
+                if not is_preserved
+            }
+            passing = [entry for i, entry in enumerate(passing) if i not in rejected]
+        for candidate, _, similarity, pll_gain in passing:
             # Track best candidate
             if pll_gain > best_pll_gain:
                 best_pll_gain = pll_gain
@@ -315,6 +419,67 @@ class RefinementPipeline:
             top_alternatives=alternatives[:3]
         )
     
+    @staticmethod
+    def _top_indices(values: np.ndarray, n: int) -> np.ndarray:
+        """
+        Indices of the n largest values, best first.
+        
+        Selects with a linear-time partition and sorts only the survivors;
+        ties keep their original order.
+        
+        Args:
+            values: Scores to rank
+            n: Number of indices to return
+        
+        Returns:
+            Up to n indices into values
+        """
+        if n <= 0:
+            return np.empty(0, dtype=np.intp)
+        if n < len(values):
+            top = np.sort(np.argpartition(-values, n - 1)[:n])
+        else:
+            top = np.arange(len(values))
+        return top[np.argsort(-values[top], kind="stable")]
+    
+    def _windowed_plls(
+        self,
+        input_ids: List[int],
+        candidate_ids: List[List[int]],
+        alignment: 'WordAlignment'
+    ) -> Tuple[float, List[float]]:
+        """
+        Compute windowed PLL for a sentence and its candidate rewrites together.
+        
+        The original sentence's PLL is cached per (token IDs, position), so
+        it is only computed the first time a word is evaluated.
+        
+        Args:
+            input_ids: Current sentence token IDs
+            candidate_ids: Token IDs of each candidate rewrite
+            alignment: Alignment of the word being replaced
+        
+        Returns:
+            Tuple of (original PLL, PLL for each candidate)
+        """
+        key = (tuple(input_ids), alignment.token_start, self.config.pll_window_size)
+        original_pll = self._orig_pll_cache.get(key)
+        
+        sequences = list(candidate_ids)
+        if original_pll is None:
+            sequences.insert(0, input_ids)
+        
+        plls = self.scorer.compute_windowed_pll_batch(
+            sequences,
+            alignment.token_start,
+            window_size=self.config.pll_window_size
+        )
+        
+        if original_pll is None:
+            original_pll = plls.pop(0)
+            self._orig_pll_cache.put(key, original_pll)
+        return original_pll, plls
+    
     def _generate_reason(
         self,
         original_score: WordScore,
@@ -416,31 +581,111 @@ class RefinementPipeline:
         # Split into sentences
         sentences = self._split_sentences(text)
         
-        refined_sentences = []
-        all_edits = []
+        if not interactive:
+            return " ".join(self._refine_and_report(sentences))
         
+        # Refine one sentence at a time so prompts follow each header
+        refined_sentences = []
         for i, sentence in enumerate(sentences):
-            if interactive:
-                print(f"\n\nProcessing sentence {i+1}/{len(sentences)}")
-                print(f"Original: {sentence}")
-            
-            result = self.refine_sentence(sentence, interactive=interactive)
+            print(f"\n\nProcessing sentence {i+1}/{len(sentences)}")
+            print(f"Original: {sentence}")
+            result = self.refine_sentence(sentence, interactive=True)
             refined_sentences.append(result.refined)
+        
+        return " ".join(refined_sentences)
+    
+    def refine_text_stream(self, chunks: Iterable[str]) -> Iterator[str]:
+        """
+        Refine a long text chunk by chunk.
+        
+        Each chunk should end on a sentence boundary (e.g. a paragraph
+        break). Chunks are processed as they arrive, so refinement of the
+        first one can start before the rest has been read, and chunk texts
+        bypass the sentence and parse caches.
+        
+        Args:
+            chunks: Pieces of the text, in order
+        
+        Yields:
+            Refined text for each non-empty chunk
+        """
+        sentence_number = 1
+        for chunk in chunks:
+            sentences = [sentence for sentence, _, _ in self._segment(chunk)]
+            if not sentences:
+                continue
             
-            if result.edits and not interactive:
-                print(f"\nSentence {i+1}: {len(result.edits)} edit(s)")
+            yield " ".join(self._refine_and_report(sentences, first_number=sentence_number))
+            sentence_number += len(sentences)
+    
+    def _refine_and_report(self, sentences: List[str], first_number: int = 1) -> List[str]:
+        """
+        Refine sentences in one batch and print the edits made to each.
+        
+        Args:
+            sentences: Sentences to refine
+            first_number: Number shown for the first sentence
+        
+        Returns:
+            Refined sentences
+        """
+        results = self.refine_sentences_batch(sentences)
+        
+        for number, result in enumerate(results, first_number):
+            if result.edits:
+                print(f"\nSentence {number}: {len(result.edits)} edit(s)")
                 for edit in result.edits:
                     print(f"  '{edit.original_word}' → '{edit.replacement}'")
-            
-            all_edits.extend(result.edits)
         
-        return " ".join(refined_sentences)
+        return [result.refined for result in results]
     
     def _split_sentences(self, text: str) -> List[str]:
-        """Split text into sentences."""
-        # Simple sentence splitter (can be improved with spaCy sentencizer)
-        doc = self.constraints.nlp(text)
-        return [sent.text.strip() for sent in doc.sents]
+        """Split text into sentences (cached on the text)."""
+        return [sentence for sentence, _, _ in self._split_sentences_with_spans(text)]
+    
+    def _split_sentences_with_spans(self, text: str) -> List[Tuple[str, int, int]]:
+        """
+        Split text into sentences with their character spans.
+        
+        Results are cached on the text.
+        
+        Args:
+            text: Input text
+        
+        Returns:
+            List of (sentence, start, end) with text[start:end] == sentence
+        """
+        sentences = self._sentence_cache.get_or_compute(
+            text,
+            lambda: self._segment(text)
+        )
+        return list(sentences)
+    
+    def _segment(self, text: str, doc=None) -> List[Tuple[str, int, int]]:
+        """
+        Split text into (sentence, start, end) spans without caching.
+        
+        Args:
+            text: Input text
+            doc: Existing Doc of text with sentence boundaries (split here
+                with the rule-based sentencizer if None)
+        
+        Returns:
+            List of (sentence, start, end) with text[start:end] == sentence
+        """
+        if doc is None:
+            doc = self.constraints.split_sentences(text)
+        return [
+            self._strip_span(sent.text, sent.start_char)
+            for sent in doc.sents
+        ]
+    
+    @staticmethod
+    def _strip_span(sentence: str, start: int) -> Tuple[str, int, int]:
+        """Strip a sentence and shift its span to match."""
+        stripped = sentence.strip()
+        start += len(sentence) - len(sentence.lstrip())
+        return stripped, start, start + len(stripped)
     
     def highlight_clunky_words(self, text: str, show_top_replacements: int = 3):
         """
@@ -455,21 +700,23 @@ class RefinementPipeline:
         """
         sentences = self._split_sentences(text)
         
-        print(f"\n{'='*70}")
-        print("HIGHLIGHTED TEXT ANALYSIS")
-        print(f"{'='*70}")
-        print(f"Original text:")
-        print(f"{text}")
-        print(f"\n{'='*70}")
-        print("Words likely to need editing:")
-        print(f"{'='*70}\n")
+        # Buffer the report and write it once; per-line prints flush the TTY
+        lines = []
+        lines.append(f"\n{'='*70}")
+        lines.append("HIGHLIGHTED TEXT ANALYSIS")
+        lines.append(f"{'='*70}")
+        lines.append(f"Original text:")
+        lines.append(f"{text}")
+        lines.append(f"\n{'='*70}")
+        lines.append("Words likely to need editing:")
+        lines.append(f"{'='*70}\n")
         
         total_highlighted = 0
         
-        for sent_idx, sentence in enumerate(sentences, 1):
-            # Extract words
-            words = self.constraints.extract_words(sentence)
-            
+        # Extract words for all sentences in one tokenizer pass
+        sentence_words = self.constraints.extract_words_batch(sentences)
+        
+        for sent_idx, (sentence, words) in enumerate(zip(sentences, sentence_words), 1):
             # Score all words
             scores = self.scorer.score_sentence(
                 sentence,
@@ -482,36 +729,51 @@ class RefinementPipeline:
             clunky_scores = [
                 s for s in scores 
                 if (s.entropy >= self.config.min_entropy or s.rank >= self.config.max_original_rank)
-                and s.word_text not in ['.', ',', '!', '?', ';', ':', '"', "'", '(', ')']
+                and s.word_text not in PUNCTUATION
             ]
             
             if not clunky_scores:
                 if len(sentences) > 1:
-                    print(f"Sentence {sent_idx}: ✓ No issues detected\n")
+                    lines.append(f"Sentence {sent_idx}: ✓ No issues detected\n")
                 continue
             
             total_highlighted += len(clunky_scores)
             
             if len(sentences) > 1:
-                print(f"{'─'*70}")
-                print(f"Sentence {sent_idx}:")
-                print(f"{'─'*70}")
+                lines.append(f"{'─'*70}")
+                lines.append(f"Sentence {sent_idx}:")
+                lines.append(f"{'─'*70}")
             
             # Get alignments and encoding for this sentence
-            alignments = self.aligner.align_words_to_tokens(sentence, words)
-            encoding = self.aligner.tokenizer(sentence, add_special_tokens=True)
-            input_ids = encoding['input_ids']
+            input_ids, alignments = self.aligner.encode_and_align(sentence, words)
+            align_map = {a.word_idx: a for a in alignments}
+            context_infos = self.constraints.context_word_infos(sentence)
+            
+            # Generate candidates for all clunky words in one batched pass
+            word_candidates = {}
+            if show_top_replacements > 0:
+                flagged = [
+                    (score, align_map[score.word_idx])
+                    for score in clunky_scores
+                    if score.word_idx in align_map
+                ]
+                batch = self.generator.generate_candidates_batch([
+                    (input_ids, alignment, score.word_text)
+                    for score, alignment in flagged
+                ])
+                for (score, _), candidates in zip(flagged, batch):
+                    word_candidates[score.word_idx] = candidates
             
             # Show each clunky word
             for score in clunky_scores:
                 # Find alignment
-                alignment = next((a for a in alignments if a.word_idx == score.word_idx), None)
+                alignment = align_map.get(score.word_idx)
                 if not alignment:
                     continue
                 
                 # Show word and scores
-                print(f"📝 '{score.word_text}'")
-                print(f"   Entropy: {score.entropy:.2f} bits | Rank: #{score.rank} | Log-prob: {score.log_prob:.2f}")
+                lines.append(f"📝 '{score.word_text}'")
+                lines.append(f"   Entropy: {score.entropy:.2f} bits | Rank: #{score.rank} | Log-prob: {score.log_prob:.2f}")
                 
                 # Determine why it's flagged
                 flags = []
@@ -520,59 +782,50 @@ class RefinementPipeline:
                 if score.rank >= self.config.max_original_rank:
                     flags.append(f"low rank (rank≥{self.config.max_original_rank})")
                 if flags:
-                    print(f"   Flagged: {', '.join(flags)}")
+                    lines.append(f"   Flagged: {', '.join(flags)}")
                 
                 # Generate and show top replacements if requested
                 if show_top_replacements > 0:
-                    candidates = self.generator.generate_candidates(
-                        input_ids,
-                        alignment,
-                        score.word_text
-                    )
+                    candidates = word_candidates[score.word_idx]
                     
                     if candidates:
                         # Filter by linguistic constraints
                         candidate_texts = [c.text for c in candidates]
-                        filtered_texts = self.constraints.filter_candidates(
-                            score.word_text,
+                        filtered_texts = self.constraints.filter_candidates_with_info(
+                            self.constraints.word_info_in_context(score.word_text, context_infos),
                             candidate_texts,
-                            sentence,
                             strict=True
                         )
                         
+                        filtered_set = set(filtered_texts)
                         filtered_candidates = [
-                            c for c in candidates if c.text in filtered_texts
+                            c for c in candidates if c.text in filtered_set
                         ]
                         
                         if filtered_candidates:
-                            print(f"   Top replacements:")
-                            for i, cand in enumerate(filtered_candidates[:show_top_replacements], 1):
-                                # Quick PLL check
-                                new_text, new_ids = self.aligner.reconstruct_sentence(
-                                    input_ids,
-                                    cand.text,
-                                    alignment
-                                )
-                                
-                                original_pll = self.scorer.compute_windowed_pll(
-                                    input_ids,
-                                    alignment.token_start,
-                                    window_size=self.config.pll_window_size
-                                )
-                                
-                                new_pll = self.scorer.compute_windowed_pll(
-                                    new_ids,
-                                    alignment.token_start,
-                                    window_size=self.config.pll_window_size
-                                )
-                                
+                            lines.append(f"   Top replacements:")
+                            shown = filtered_candidates[:show_top_replacements]
+                            candidate_ids = self.aligner.reconstruct_ids_batch(
+                                input_ids,
+                                [cand.text for cand in shown],
+                                alignment,
+                                [cand.token_ids for cand in shown]
+                            )
+                            similarities = self.semantic_checker.batch_compute_similarity(
+                                sentence,
+                                [self.aligner.reconstruct_text(new_ids) for new_ids in candidate_ids]
+                            )
+                            
+                            # Quick PLL check for all shown candidates at once
+                            original_pll, new_plls = self._windowed_plls(
+                                input_ids, candidate_ids, alignment
+                            )
+                            
+                            for i, (cand, similarity, new_pll) in enumerate(
+                                zip(shown, similarities, new_plls), 1
+                            ):
                                 pll_gain = new_pll - original_pll
                                 
-                                similarity = self.semantic_checker.compute_similarity(
-                                    sentence,
-                                    new_text
-                                )
-                                
                                 # Check if passes thresholds
                                 passes = (
                                     pll_gain >= self.config.min_pll_gain and 
@@ -580,24 +833,26 @@ class RefinementPipeline:
                                 )
                                 status = "✓" if passes else " "
                                 
-                                print(f"   {status} {i}. {cand.text:15} → ΔLL= {pll_gain:+6.2f} | sim={similarity:.3f} | p= {cand.log_prob:6.2f}")
+                                lines.append(f"   {status} {i}. {cand.text:15} → ΔLL= {pll_gain:+6.2f} | sim={similarity:.3f} | p= {cand.log_prob:6.2f}")
                 
-                print()  # Blank line between words
+                lines.append("")  # Blank line between words
         
         # Summary
-        print(f"{'='*70}")
+        lines.append(f"{'='*70}")
         if total_highlighted == 0:
-            print("✓ No issues detected in the text!")
+            lines.append("✓ No issues detected in the text!")
         else:
-            print(f"Summary: {total_highlighted} word(s) highlighted across {len(sentences)} sentence(s)")
-            print(f"\nLegend:")
-            print(f"  • Entropy (H): Higher = more uncertain (threshold: {self.config.min_entropy:.1f} bits)")
-            print(f"  • Rank: Position in probability distribution (threshold: {self.config.max_original_rank})")
-            print(f"  • ΔLL: Change in log-likelihood (fluency gain, threshold: {self.config.min_pll_gain:.1f})")
-            print(f"  • sim: Semantic similarity (threshold: {self.config.min_sbert_cosine:.2f})")
-            print(f"  • p: Log probability of replacement candidate")
-            print(f"  • ✓: Candidate passes all thresholds")
-        print(f"{'='*70}\n")
+            lines.append(f"Summary: {total_highlighted} word(s) highlighted across {len(sentences)} sentence(s)")
+            lines.append(f"\nLegend:")
+            lines.append(f"  • Entropy (H): Higher = more uncertain (threshold: {self.config.min_entropy:.1f} bits)")
+            lines.append(f"  • Rank: Position in probability distribution (threshold: {self.config.max_original_rank})")
+            lines.append(f"  • ΔLL: Change in log-likelihood (fluency gain, threshold: {self.config.min_pll_gain:.1f})")
+            lines.append(f"  • sim: Semantic similarity (threshold: {self.config.min_sbert_cosine:.2f})")
+            lines.append(f"  • p: Log probability of replacement candidate")
+            lines.append(f"  • ✓: Candidate passes all thresholds")
+        lines.append(f"{'='*70}\n")
+        
+        sys.stdout.write("\n".join(lines) + "\n")
     
     def show_candidates_for_text(self, text: str, top_n: int = 5):
         """
@@ -608,16 +863,16 @@ class RefinementPipeline:
             top_n: Number of top modifications to show for the entire sentence
         """
         sentences = self._split_sentences(text)
+        lines = []
+        
+        sentence_words = self.constraints.extract_words_batch(sentences)
         
-        for sent_idx, sentence in enumerate(sentences, 1):
+        for sent_idx, (sentence, words) in enumerate(zip(sentences, sentence_words), 1):
             if len(sentences) > 1:
-                print(f"\n{'='*70}")
-                print(f"Sentence {sent_idx}:")
-                print(f"{'='*70}")
-                print(f"{sentence}\n")
-            
-            # Extract words
-            words = self.constraints.extract_words(sentence)
+                lines.append(f"\n{'='*70}")
+                lines.append(f"Sentence {sent_idx}:")
+                lines.append(f"{'='*70}")
+                lines.append(f"{sentence}\n")
             
             # Score all words
             scores = self.scorer.score_sentence(
@@ -627,117 +882,131 @@ class RefinementPipeline:
                 max_rank=100000
             )
             
-            # Get alignments and encoding
-            alignments = self.aligner.align_words_to_tokens(sentence, words)
-            encoding = self.aligner.tokenizer(sentence, add_special_tokens=True)
-            input_ids = encoding['input_ids']
+            # Get alignments, encoding and in-context word info
+            input_ids, alignments = self.aligner.encode_and_align(sentence, words)
+            context_infos = self.constraints.context_word_infos(sentence)
             
-            # Collect all possible modifications with their scores
-            all_modifications = []
+            # Skip punctuation
+            word_pairs = [
+                (score, alignment)
+                for score, alignment in zip(scores, alignments)
+                if score.word_text not in PUNCTUATION
+            ]
             
-            for score, alignment in zip(scores, alignments):
-                # Skip punctuation
-                if score.word_text in ['.', ',', '!', '?', ';', ':', '"', "'", '(', ')']:
-                    continue
-                
-                # Generate candidates
-                candidates = self.generator.generate_candidates(
-                    input_ids,
-                    alignment,
-                    score.word_text
-                )
-                
+            # Generate candidates for every word in one batched pass
+            word_candidates = self.generator.generate_candidates_batch([
+                (input_ids, alignment, score.word_text)
+                for score, alignment in word_pairs
+            ])
+            
+            # Pass 1: reconstruct the sentence with every viable candidate
+            # of every word
+            word_edits = []  # (score, alignment, candidates, reconstructions)
+            
+            for (score, alignment), candidates in zip(word_pairs, word_candidates):
                 if not candidates:
                     continue
                 
                 # Filter by linguistic constraints
                 candidate_texts = [c.text for c in candidates]
-                filtered_texts = self.constraints.filter_candidates(
-                    score.word_text,
+                filtered_texts = self.constraints.filter_candidates_with_info(
+                    self.constraints.word_info_in_context(score.word_text, context_infos),
                     candidate_texts,
-                    sentence,
                     strict=True
                 )
                 
+                filtered_set = set(filtered_texts)
                 filtered_candidates = [
-                    c for c in candidates if c.text in filtered_texts
+                    c for c in candidates if c.text in filtered_set
                 ]
                 
-                # Evaluate each candidate
-                for candidate in filtered_candidates[:10]:  # Consider top 10 per word
-                    # Reconstruct sentence
-                    new_text, new_ids = self.aligner.reconstruct_sentence(
-                        input_ids,
-                        candidate.text,
-                        alignment
-                    )
-                    
-                    # Compute metrics
-                    original_pll = self.scorer.compute_windowed_pll(
-                        input_ids,
-                        alignment.token_start,
-                        window_size=self.config.pll_window_size
-                    )
-                    
-                    new_pll = self.scorer.compute_windowed_pll(
-                        new_ids,
-                        alignment.token_start,
-                        window_size=self.config.pll_window_size
-                    )
-                    
-                    pll_gain = new_pll - original_pll
-                    
-                    similarity = self.semantic_checker.compute_similarity(
-                        sentence,
-                        new_text
-                    )
-                    
-                    # Compute composite quality score
-                    # Prioritize: high entropy words, positive PLL gain, high similarity
-                    quality_score = (
-                        score.entropy * 0.3 +           # Prioritize fixing "clunky" words
-                        pll_gain * 2.0 +                 # Fluency improvement (most important)
-                        similarity * 10.0 +              # Semantic preservation
-                        candidate.log_prob * 0.1         # Candidate probability
-                    )
-                    
-                    all_modifications.append({
-                        'original_word': score.word_text,
-                        'replacement': candidate.text,
-                        'new_text': new_text,
-                        'entropy': score.entropy,
-                        'rank': score.rank,
-                        'pll_gain': pll_gain,
-                        'similarity': similarity,
-                        'candidate_logprob': candidate.log_prob,
-                        'quality_score': quality_score,
-                        'passes_thresholds': (
-                            pll_gain >= self.config.min_pll_gain and 
-                            similarity >= self.config.min_sbert_cosine
-                        )
-                    })
+                # Reconstruct the sentence with each candidate
+                considered = filtered_candidates[:10]  # Consider top 10 per word
+                if not considered:
+                    continue
+                candidate_ids = self.aligner.reconstruct_ids_batch(
+                    input_ids,
+                    [candidate.text for candidate in considered],
+                    alignment,
+                    [candidate.token_ids for candidate in considered]
+                )
+                reconstructions = [
+                    (self.aligner.reconstruct_text(new_ids), new_ids)
+                    for new_ids in candidate_ids
+                ]
+                word_edits.append((score, alignment, considered, reconstructions))
             
-            # Sort by quality score (descending)
-            all_modifications.sort(key=lambda x: x['quality_score'], reverse=True)
+            # Pass 2: one SBERT batch for every rewrite of the sentence
+            all_similarities = self.semantic_checker.batch_compute_similarity(
+                sentence,
+                [
+                    new_text
+                    for _, _, _, reconstructions in word_edits
+                    for new_text, _ in reconstructions
+                ]
+            )
+            
+            # Collect all possible modifications; their features go into one
+            # array so quality scoring and ranking are a single numpy pass
+            evaluated = []  # (score, candidate, new_text)
+            features = []  # (entropy, pll_gain, similarity, candidate log prob)
+            
+            offset = 0
+            for score, alignment, considered, reconstructions in word_edits:
+                similarities = all_similarities[offset:offset + len(considered)]
+                offset += len(considered)
+                
+                # Windows are centered on each word, so PLL batches per word
+                original_pll, new_plls = self._windowed_plls(
+                    input_ids,
+                    [new_ids for _, new_ids in reconstructions],
+                    alignment
+                )
+                
+                # Record each candidate's features
+                for candidate, (new_text, _), similarity, new_pll in zip(
+                    considered, reconstructions, similarities, new_plls
+                ):
+                    evaluated.append((score, candidate, new_text))
+                    features.append((
+                        score.entropy,
+                        new_pll - original_pll,
+                        similarity,
+                        candidate.log_prob
+                    ))
+            
+            # Composite quality score. Prioritize: high entropy words,
+            # positive PLL gain (most important), high similarity, candidate
+            # probability
+            feature_array = np.asarray(features, dtype=np.float64).reshape(-1, 4)
+            quality_scores = feature_array @ QUALITY_WEIGHTS
+            passes_thresholds = (
+                (feature_array[:, 1] >= self.config.min_pll_gain) &
+                (feature_array[:, 2] >= self.config.min_sbert_cosine)
+            )
+            order = self._top_indices(quality_scores, top_n)
             
             # Display results
-            print(f"{'─'*70}")
-            print(f"Top {top_n} most promising modifications:")
-            print(f"{'─'*70}")
-            print(f"Legend: ✓ = passes thresholds (ΔLL ≥ {self.config.min_pll_gain:.1f}, sim ≥ {self.config.min_sbert_cosine:.2f})")
-            print(f"{'─'*70}\n")
-            
-            if not all_modifications:
-                print("No linguistically compatible modifications found.\n")
+            lines.append(f"{'─'*70}")
+            lines.append(f"Top {top_n} most promising modifications:")
+            lines.append(f"{'─'*70}")
+            lines.append(f"Legend: ✓ = passes thresholds (ΔLL ≥ {self.config.min_pll_gain:.1f}, sim ≥ {self.config.min_sbert_cosine:.2f})")
+            lines.append(f"{'─'*70}\n")
+            
+            if not evaluated:
+                lines.append("No linguistically compatible modifications found.\n")
                 continue
             
-            # Show top N modifications
-            for i, mod in enumerate(all_modifications[:top_n], 1):
-                status = "✓" if mod['passes_thresholds'] else " "
+            # Show top N modifications (only these are materialized)
+            for i, row in enumerate(order.tolist(), 1):
+                score, candidate, new_text = evaluated[row]
+                _, pll_gain, similarity, _ = features[row]
+                status = "✓" if passes_thresholds[row] else " "
                 
-                print(f"{status} {i}. '{mod['original_word']}' → '{mod['replacement']}'")
-                print(f"   Modified: {mod['new_text']}")
-                print(f"   Quality: {mod['quality_score']:6.2f} | ΔLL: {mod['pll_gain']:+6.2f} | sim: {mod['similarity']:.3f}")
-                print(f"   Original entropy: {mod['entropy']:.2f} bits | rank: #{mod['rank']}")
-                print()
-
+                lines.append(f"{status} {i}. '{score.word_text}' → '{candidate.text}'")
+                lines.append(f"   Modified: {new_text}")
+                lines.append(f"   Quality: {quality_scores[row]:6.2f} | ΔLL: {pll_gain:+6.2f} | sim: {similarity:.3f}")
+                lines.append(f"   Original entropy: {score.entropy:.2f} bits | rank: #{score.rank}")
+                lines.append("")
+        
+        sys.stdout.write("\n".join(lines) + "\n")
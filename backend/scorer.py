@@ -1,14 +1,22 @@
 """Bidirectional scoring using RoBERTa for entropy and PLL computation."""
 
+import contextlib
+import math
+import threading
 import torch
 import torch.nn.functional as F
 from typing import List, Dict, Tuple, Optional
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
+import os
 import numpy as np
-from transformers import AutoModelForMaskedLM, AutoTokenizer
+from transformers import AutoModelForMaskedLM
 
+from .cache_utils import DiskCache, LRUCache
 from .tokenizer_utils import TokenizerAligner, WordAlignment
 
+# Converts entropies from nats to bits
+INV_LN2 = 1.0 / math.log(2)
+
 
 @dataclass
 class WordScore:
@@ -21,14 +29,118 @@ class WordScore:
     is_clunky: bool  # whether this word is flagged for replacement
 
 
+@dataclass
+class ScoreArrays:
+    """
+    Unflagged scores for the words of one sentence, as parallel arrays.
+    
+    Thresholds are applied with one vectorized comparison; WordScore
+    objects are only built where a caller needs them.
+    """
+    word_idx: np.ndarray  # [num_words] word index in sentence
+    word_text: List[str]
+    entropy: np.ndarray  # [num_words] bits
+    log_prob: np.ndarray  # [num_words] log probability of original word
+    rank: np.ndarray  # [num_words] rank of original word in distribution
+    
+    def __len__(self) -> int:
+        return len(self.word_text)
+    
+    @classmethod
+    def from_columns(
+        cls,
+        word_idx: List[int],
+        word_text: List[str],
+        entropy: List[float],
+        log_prob: List[float],
+        rank: List[int]
+    ) -> "ScoreArrays":
+        """Build from per-word Python lists."""
+        return cls(
+            word_idx=np.asarray(word_idx, dtype=np.int64),
+            word_text=list(word_text),
+            entropy=np.asarray(entropy, dtype=np.float64),
+            log_prob=np.asarray(log_prob, dtype=np.float64),
+            rank=np.asarray(rank, dtype=np.int64)
+        )
+    
+    @classmethod
+    def from_word_scores(cls, scores: List[WordScore]) -> "ScoreArrays":
+        """Build from WordScore objects (flags are dropped)."""
+        return cls.from_columns(
+            [score.word_idx for score in scores],
+            [score.word_text for score in scores],
+            [score.entropy for score in scores],
+            [score.log_prob for score in scores],
+            [score.rank for score in scores]
+        )
+    
+    def clunky_mask(self, min_entropy: float, max_rank: int) -> np.ndarray:
+        """
+        Flag words with high entropy or a poorly ranked original.
+        
+        Args:
+            min_entropy: Threshold for flagging high entropy
+            max_rank: Threshold for flagging poor ranking
+        
+        Returns:
+            Bool array [num_words], True for clunky words
+        """
+        return (self.entropy >= min_entropy) | (self.rank >= max_rank)
+    
+    def word_scores(self, is_clunky: Optional[np.ndarray] = None) -> List[WordScore]:
+        """
+        Materialize WordScore objects.
+        
+        Args:
+            is_clunky: Flag for each word (all False if omitted)
+        
+        Returns:
+            List of WordScore objects
+        """
+        flags = [False] * len(self) if is_clunky is None else is_clunky.tolist()
+        return [
+            WordScore(
+                word_idx=word_idx,
+                word_text=word_text,
+                entropy=entropy,
+                log_prob=log_prob,
+                rank=rank,
+                is_clunky=flag
+            )
+            for word_idx, word_text, entropy, log_prob, rank, flag in zip(
+                self.word_idx.tolist(),
+                self.word_text,
+                self.entropy.tolist(),
+                self.log_prob.tolist(),
+                self.rank.tolist(),
+                flags
+            )
+        ]
+
+
 class BidirectionalScorer:
     """Score words using RoBERTa's masked language modeling."""
     
+    # Bump when scoring changes so persisted scores are not reused
+    SCORE_CACHE_VERSION = 2
+    
+    # Ranks up to this are read from a top-k instead of the full vocabulary
+    RANK_TOPK = 64
+    
     def __init__(
         self,
         model_name: str = "roberta-large",
         device: str = "cpu",
-        pll_method: str = "word-l2r"
+        pll_method: str = "word-l2r",
+        batch_size: int = 8,
+        cache_size: int = 4096,
+        quantize: bool = False,
+        span_cache_size: int = 256,
+        position_cache_size: int = 16384,
+        cache_dir: Optional[str] = None,
+        compile: bool = False,
+        low_precision: bool = True
     ):
         """
         Initialize the scorer.
@@ -37,33 +149,241 @@ class BidirectionalScorer:
             model_name: HuggingFace model name
             device: "cpu" or "cuda"
             pll_method: "word-l2r" (recommended) or "standard"
+            batch_size: Maximum number of masked sequences per forward pass
+            cache_size: Entries kept in the sentence score cache
+            quantize: Apply dynamic int8 quantization to Linear layers
+                (CPU only)
+            span_cache_size: Masked-span logit rows kept for reuse by
+                candidate generation
+            position_cache_size: Per-position windowed PLL log probs kept
+                for reuse across overlapping windows
+            cache_dir: Directory for a persistent sentence score cache
+                shared across runs (None disables it)
+            compile: Compile the model with torch.compile; inputs are then
+                padded to power-of-two lengths to bound recompilation
+            low_precision: Run forwards in bfloat16/float16 where the
+                hardware supports it (on CUDA the weights are stored in
+                that dtype as well)
         """
         self.device = device
         self.pll_method = pll_method
+        self.batch_size = batch_size
         
-        self.model = AutoModelForMaskedLM.from_pretrained(model_name)
+        self.model = self._load_model(model_name)
         self.model.to(device)
         self.model.eval()
         
-        self.aligner = TokenizerAligner(model_name)
+        if quantize and device == "cpu":
+            self.model = torch.quantization.quantize_dynamic(
+                self.model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+        
+        # Reduced-precision matmuls where the hardware has native support
+        # (int8 quantized Linear layers don't take part in autocast)
+        self.autocast_dtype = None
+        if low_precision and not (quantize and device == "cpu"):
+            self.autocast_dtype = self._autocast_dtype(device)
+        
+        # On CUDA also keep the weights in that dtype, halving the bytes each
+        # forward reads instead of re-casting float32 weights per call
+        if self.autocast_dtype is not None and device.startswith("cuda"):
+            self.model.to(self.autocast_dtype)
+        
+        self.compiled = False
+        if compile and hasattr(torch, "compile"):
+            self.model = torch.compile(self.model, mode="reduce-overhead", dynamic=False)
+            self.compiled = True
+        
+        self.aligner = TokenizerAligner(model_name, cache_size=cache_size)
         self.tokenizer = self.aligner.tokenizer
+        
+        # Special token IDs as plain ints (read in every batch build)
+        self.mask_id = int(self.tokenizer.mask_token_id)
+        self.pad_id = int(self.tokenizer.pad_token_id or 0)
+        self.cls_id = int(self.tokenizer.cls_token_id)
+        self.sep_id = int(self.tokenizer.sep_token_id)
+        
+        # Unflagged word scores keyed by (text, words)
+        self._score_cache = LRUCache(cache_size)
+        self._disk_cache = None
+        if cache_dir is not None:
+            # Scores depend on the model, PLL method, quantization, device
+            # and the precision forwards actually run in
+            precision = self.autocast_dtype if self.autocast_dtype is not None else torch.float32
+            self._disk_cache = DiskCache(
+                os.path.join(cache_dir, "scores.sqlite"),
+                namespace=(
+                    f"{self.SCORE_CACHE_VERSION}:{model_name}:{pll_method}:"
+                    f"{quantize}:{low_precision}:{device}:{precision}"
+                )
+            )
+        
+        # Logits at the first position of fully masked word spans, shared
+        # with candidate generation (one vocab-sized row per entry)
+        self._span_logits = LRUCache(span_cache_size)
+        
+        # Log prob of the token at one masked position, keyed by
+        # (token IDs, position); overlapping PLL windows share entries
+        self._position_log_probs = LRUCache(position_cache_size)
+        
+        # Reusable per-thread input buffers for _masked_logits
+        self._buffers = threading.local()
+        
+        if self.compiled:
+            self._warmup()
+    
+    @staticmethod
+    def _load_model(model_name: str) -> AutoModelForMaskedLM:
+        """
+        Load the masked LM with fused scaled-dot-product attention.
+        
+        Weights are loaded straight into place (low_cpu_mem_usage) rather
+        than into a randomly initialized copy first, halving peak memory.
+        They load as float32: dynamic quantization needs float weights, and
+        reduced precision is applied afterwards (see __init__). Falls back to
+        the default loading on transformers/torch versions without SDPA
+        support (or without accelerate for low_cpu_mem_usage).
+        """
+        try:
+            return AutoModelForMaskedLM.from_pretrained(
+                model_name,
+                attn_implementation="sdpa",
+                torch_dtype=torch.float32,
+                low_cpu_mem_usage=True
+            )
+        except (TypeError, ValueError, ImportError):
+            return AutoModelForMaskedLM.from_pretrained(model_name)
+    
+    @staticmethod
+    def _autocast_dtype(device: str) -> Optional[torch.dtype]:
+        """
+        Pick a reduced-precision autocast dtype supported by the device.
+        
+        Returns:
+            bfloat16 on CUDA (compute capability 8.0+) or CPUs with
+            AVX512-BF16/AMX, float16 on older CUDA GPUs, None otherwise
+        """
+        if device.startswith("cuda"):
+            if torch.cuda.is_bf16_supported():
+                return torch.bfloat16
+            return torch.float16
+        
+        if device == "cpu":
+            cpu_backend = getattr(torch._C, "_cpu", None)
+            for check in ("_is_amx_tile_supported", "_is_avx512_bf16_supported"):
+                supported = getattr(cpu_backend, check, None)
+                if supported is not None and supported():
+                    return torch.bfloat16
+        
+        return None
+    
+    def _autocast(self):
+        """Autocast context for model forwards (a no-op when disabled)."""
+        if self.autocast_dtype is None:
+            return contextlib.nullcontext()
+        device_type = "cuda" if self.device.startswith("cuda") else "cpu"
+        return torch.autocast(device_type=device_type, dtype=self.autocast_dtype)
+    
+    def clear_cache(self) -> None:
+        """Drop cached scores and tokenizations (e.g. after swapping models)."""
+        self._score_cache.clear()
+        self._span_logits.clear()
+        self._position_log_probs.clear()
+        self.aligner.clear_cache()
+    
+    @staticmethod
+    def _span_key(input_ids: List[int], word_alignment: WordAlignment) -> Tuple:
+        """Cache key for a sentence with one word span masked."""
+        return (tuple(input_ids), word_alignment.token_start, word_alignment.token_end)
+    
+    def span_logits(
+        self,
+        input_ids: List[int],
+        word_alignment: WordAlignment
+    ) -> Optional[torch.Tensor]:
+        """
+        Look up logits computed while scoring, for a fully masked word.
+        
+        Args:
+            input_ids: Unmasked sentence token IDs
+            word_alignment: Word whose span was masked
+        
+        Returns:
+            Logits at the word's first position [vocab_size], or None if
+            that masked input hasn't been scored recently
+        """
+        return self._span_logits.get(self._span_key(input_ids, word_alignment))
     
     def compute_entropy(self, logits: torch.Tensor) -> float:
         """
         Compute entropy of a probability distribution.
         
+        Batched scoring computes entropies for all rows at once in
+        _row_statistics; this is the single-position form.
+        
         Args:
             logits: Logits for a single position [vocab_size]
         
         Returns:
             Entropy in bits
         """
-        probs = F.softmax(logits, dim=-1)
-        log_probs = F.log_softmax(logits, dim=-1)
-        entropy_nats = -(probs * log_probs).sum().item()
-        entropy_bits = entropy_nats / np.log(2)  # convert to bits
-        return entropy_bits
+        return float(self._entropy_bits(F.log_softmax(logits.float(), dim=-1)))
+    
+    @staticmethod
+    def _entropy_bits(log_probs: torch.Tensor) -> torch.Tensor:
+        """
+        Entropy in bits of each distribution, on the input's device.
+        
+        Args:
+            log_probs: Log probabilities [..., vocab_size]
+        
+        Returns:
+            Entropies [...]
+        """
+        entropy_nats = -(log_probs.exp() * log_probs).sum(dim=-1)
+        return entropy_nats * INV_LN2  # convert to bits
     
+    def _row_statistics(
+        self,
+        logits: torch.Tensor,
+        target_ids: List[int]
+    ) -> Tuple[List[float], List[float], List[int]]:
+        """
+        Compute entropy, target log prob and target rank for many rows at once.
+        
+        Args:
+            logits: Logits at the masked positions [num_rows, vocab_size]
+            target_ids: Original token ID for each row
+        
+        Returns:
+            Tuple of (entropies in bits, log probabilities, ranks)
+        """
+        log_probs = F.log_softmax(logits.float(), dim=-1)
+        entropies = self._entropy_bits(log_probs)
+        
+        targets = torch.tensor(target_ids, device=log_probs.device).unsqueeze(1)
+        target_log_probs = log_probs.gather(1, targets)
+        
+        # Rank (how many tokens are more probable). Most original words sit
+        # near the top, where every more probable token is in a small top-k;
+        # only the remaining rows need the full-vocabulary comparison
+        top_k = min(self.RANK_TOPK, log_probs.size(-1))
+        top_log_probs, top_indices = log_probs.topk(top_k, dim=-1)
+        found = (top_indices == targets).any(dim=-1)
+        ranks = (top_log_probs > target_log_probs).sum(dim=-1) + 1
+        if not bool(found.all()):
+            missed = ~found
+            ranks[missed] = (
+                log_probs[missed] > target_log_probs[missed]
+            ).sum(dim=-1) + 1
+        
+        return (
+            entropies.tolist(),
+            target_log_probs.squeeze(1).tolist(),
+            ranks.tolist()
+        )
+    
+    @torch.inference_mode()
     def score_word(
         self,
         input_ids: List[int],
@@ -107,34 +427,24 @@ class BidirectionalScorer:
         return_distribution: bool
     ) -> Tuple[WordScore, Optional[torch.Tensor]]:
         """Score a single-piece word."""
-        # Mask the word
+        # Mask the word and get logits at its position
         masked_ids = self.aligner.mask_word_span(input_ids, word_alignment)
+        logits = self._masked_logits([masked_ids], [word_alignment.token_start])
         
-        # Get logits
-        with torch.no_grad():
-            input_tensor = torch.tensor([masked_ids]).to(self.device)
-            outputs = self.model(input_tensor)
-            logits = outputs.logits[0, word_alignment.token_start]  # [vocab_size]
-        
-        # Compute entropy
-        entropy = self.compute_entropy(logits)
+        # Entropy, probability and rank of the original token
+        entropies, log_probs, ranks = self._row_statistics(
+            logits,
+            [word_alignment.token_ids[0]]
+        )
         
-        # Get probability and rank of original token
-        probs = F.softmax(logits, dim=-1)
-        original_token_id = word_alignment.token_ids[0]
-        log_prob = F.log_softmax(logits, dim=-1)[original_token_id].item()
-        
-        # Rank (how many tokens are more probable)
-        rank = (probs > probs[original_token_id]).sum().item() + 1
-        
-        distribution = probs if return_distribution else None
+        distribution = F.softmax(logits[0], dim=-1) if return_distribution else None
         
         return WordScore(
             word_idx=word_alignment.word_idx,
             word_text=word_alignment.word_text,
-            entropy=entropy,
-            log_prob=log_prob,
-            rank=int(rank),
+            entropy=entropies[0],
+            log_prob=log_probs[0],
+            rank=int(ranks[0]),
             is_clunky=False  # will be set by caller based on thresholds
         ), distribution
     
@@ -148,60 +458,29 @@ class BidirectionalScorer:
         Score a multi-piece word using pseudo-log-likelihood.
         
         PLL = sum of log P(piece_i | context, other pieces in word)
+        
+        All pieces are scored in one batched forward pass, one masked row
+        per piece.
         """
         num_pieces = word_alignment.token_end - word_alignment.token_start
-        total_log_prob = 0.0
-        entropies = []
-        distributions = []
-        
-        for i in range(num_pieces):
-            if self.pll_method == "word-l2r":
-                # Mask current piece and pieces to the right within the word
-                masked_ids = input_ids.copy()
-                for j in range(i, num_pieces):
-                    masked_ids[word_alignment.token_start + j] = self.aligner.mask_token_id
-            else:
-                # Standard: mask only current piece
-                masked_ids = self.aligner.mask_word_span(
-                    input_ids,
-                    word_alignment,
-                    mask_position=i
-                )
-            
-            # Get logits for this position
-            with torch.no_grad():
-                input_tensor = torch.tensor([masked_ids]).to(self.device)
-                outputs = self.model(input_tensor)
-                logits = outputs.logits[0, word_alignment.token_start + i]
-            
-            # Entropy
-            entropy = self.compute_entropy(logits)
-            entropies.append(entropy)
-            
-            # Log probability of actual token
-            original_token_id = word_alignment.token_ids[i]
-            log_prob = F.log_softmax(logits, dim=-1)[original_token_id].item()
-            total_log_prob += log_prob
-            
-            if return_distribution and i == 0:
-                # Return distribution for first piece (for candidate generation)
-                distributions.append(F.softmax(logits, dim=-1))
         
-        # Average entropy across pieces
-        avg_entropy = np.mean(entropies)
+        masked_sequences = list(self._piece_masked_rows(input_ids, word_alignment))
+        positions = [word_alignment.token_start + i for i in range(num_pieces)]
+        logits = self._masked_logits(masked_sequences, positions)
         
-        # Approximate rank based on total log prob
-        # For multi-piece, rank is less meaningful, so we use a heuristic
-        if total_log_prob > -2.0:
-            rank = 1
-        elif total_log_prob > -5.0:
-            rank = 10
-        elif total_log_prob > -10.0:
-            rank = 50
-        else:
-            rank = 100
+        entropies, log_probs, _ = self._row_statistics(
+            logits,
+            list(word_alignment.token_ids[:num_pieces])
+        )
+        
+        # Average entropy and total log prob across pieces
+        avg_entropy = float(np.mean(entropies))
+        total_log_prob = sum(log_probs)
         
-        distribution = distributions[0] if distributions else None
+        rank = self._approximate_rank(total_log_prob)
+        
+        # Distribution for the first piece (for candidate generation)
+        distribution = F.softmax(logits[0], dim=-1) if return_distribution else None
         
         return WordScore(
             word_idx=word_alignment.word_idx,
@@ -212,6 +491,44 @@ class BidirectionalScorer:
             is_clunky=False
         ), distribution
     
+    def _piece_masked_rows(
+        self,
+        input_ids: List[int],
+        word_alignment: WordAlignment
+    ) -> np.ndarray:
+        """
+        Build the masked inputs for scoring every piece of a multi-piece word.
+        
+        Args:
+            input_ids: Full sentence token IDs
+            word_alignment: Word being scored
+        
+        Returns:
+            Token IDs [num_pieces, seq_len]; row i has piece i masked
+            (word-l2r: piece i and every piece to its right within the word)
+        """
+        return self.aligner.batch_mask_word_positions(
+            input_ids,
+            word_alignment,
+            mask_following=self.pll_method == "word-l2r"
+        )
+    
+    @staticmethod
+    def _approximate_rank(total_log_prob: float) -> int:
+        """
+        Approximate rank of a multi-piece word from its total log prob.
+        
+        For multi-piece, rank is less meaningful, so we use a heuristic.
+        """
+        if total_log_prob > -2.0:
+            return 1
+        elif total_log_prob > -5.0:
+            return 10
+        elif total_log_prob > -10.0:
+            return 50
+        else:
+            return 100
+    
     def score_sentence(
         self,
         text: str,
@@ -222,6 +539,9 @@ class BidirectionalScorer:
         """
         Score all words in a sentence.
         
+        Scores are cached on (text, words), so re-scoring an unchanged
+        sentence with different thresholds skips the model entirely.
+        
         Args:
             text: Sentence text
             words: List of words
@@ -231,27 +551,254 @@ class BidirectionalScorer:
         Returns:
             List of WordScore objects
         """
-        # Get alignments
-        alignments = self.aligner.align_words_to_tokens(text, words)
+        return self.score_sentences(
+            [(text, words)],
+            min_entropy=min_entropy,
+            max_rank=max_rank
+        )[0]
+    
+    def score_sentences(
+        self,
+        sentences: List[Tuple[str, List[str]]],
+        min_entropy: float = 4.0,
+        max_rank: int = 50
+    ) -> List[List[WordScore]]:
+        """
+        Score all words of several sentences with batched forward passes.
+        
+        The masked inputs of every uncached sentence are stacked into the
+        same batch, so concurrent sentences share model calls.
+        
+        Args:
+            sentences: (text, words) pairs
+            min_entropy: Threshold for flagging high entropy
+            max_rank: Threshold for flagging poor ranking
+        
+        Returns:
+            List of WordScore lists, one per sentence
+        """
+        return [
+            arrays.word_scores(arrays.clunky_mask(min_entropy, max_rank))
+            for arrays in self.score_sentence_arrays(sentences)
+        ]
+    
+    @torch.inference_mode()
+    def score_sentence_arrays(
+        self,
+        sentences: List[Tuple[str, List[str]]]
+    ) -> List[ScoreArrays]:
+        """
+        Score all words of several sentences, returning unflagged arrays.
+        
+        Scores are cached on (text, words), so re-scoring an unchanged
+        sentence with different thresholds skips the model entirely.
+        
+        Args:
+            sentences: (text, words) pairs
+        
+        Returns:
+            ScoreArrays for each sentence
+        """
+        keys = [(text, tuple(words)) for text, words in sentences]
+        raw_scores = [self._score_cache.get(key) for key in keys]
+        
+        # Fall back to the persistent cache before running the model
+        if self._disk_cache is not None:
+            for i, scores in enumerate(raw_scores):
+                if scores is None:
+                    stored = self._disk_cache.get(keys[i])
+                    if stored is not None:
+                        raw_scores[i] = ScoreArrays.from_word_scores(
+                            [WordScore(**fields) for fields in stored]
+                        )
+                        self._score_cache.put(keys[i], raw_scores[i])
+        
+        # Score all cache misses together
+        missing = [i for i, scores in enumerate(raw_scores) if scores is None]
+        if missing:
+            computed = self._score_batch([sentences[i] for i in missing])
+            for i, scores in zip(missing, computed):
+                self._score_cache.put(keys[i], scores)
+                if self._disk_cache is not None:
+                    self._disk_cache.put(
+                        keys[i],
+                        [asdict(score) for score in scores.word_scores()]
+                    )
+                raw_scores[i] = scores
         
-        # Tokenize sentence
-        encoding = self.tokenizer(text, add_special_tokens=True)
-        input_ids = encoding['input_ids']
+        return raw_scores
+    
+    def _score_batch(
+        self,
+        sentences: List[Tuple[str, List[str]]]
+    ) -> List[ScoreArrays]:
+        """Score every aligned word of each sentence (uncached, unflagged)."""
+        masked_sequences = []
+        positions = []
+        target_ids = []
+        word_rows = []  # (sentence index, alignment, first row, row count)
+        span_rows = []  # (row, span key) for rows masking a whole word
         
-        # Score each word
-        scores = []
-        for alignment in alignments:
-            score, _ = self.score_word(input_ids, alignment, return_distribution=False)
+        for sent_idx, (text, words) in enumerate(sentences):
+            input_ids, alignments = self.aligner.encode_and_align(text, words)
             
-            # Flag as clunky if meets criteria
-            score.is_clunky = (
-                score.entropy >= min_entropy or
-                score.rank >= max_rank
-            )
+            for alignment in alignments:
+                num_pieces = alignment.token_end - alignment.token_start
+                first_row = len(masked_sequences)
+                
+                # Single-piece rows and the first word-l2r row mask the whole
+                # span, exactly the input candidate generation needs
+                if num_pieces == 1 or self.pll_method == "word-l2r":
+                    span_rows.append((first_row, self._span_key(input_ids, alignment)))
+                
+                if num_pieces == 1:
+                    # Single piece - mask the word
+                    masked_sequences.append(
+                        self.aligner.mask_word_span(input_ids, alignment)
+                    )
+                    positions.append(alignment.token_start)
+                    target_ids.append(alignment.token_ids[0])
+                else:
+                    # Multi-piece - one masked row per piece (PLL)
+                    masked_sequences.extend(self._piece_masked_rows(input_ids, alignment))
+                    positions.extend(range(alignment.token_start, alignment.token_end))
+                    target_ids.extend(alignment.token_ids[:num_pieces])
+                
+                word_rows.append((sent_idx, alignment, first_row, num_pieces))
+        
+        # Per sentence: word_idx, word_text, entropy, log_prob, rank columns
+        columns = [([], [], [], [], []) for _ in sentences]
+        if not masked_sequences:
+            return [ScoreArrays.from_columns(*cols) for cols in columns]
+        
+        logits = self._masked_logits(masked_sequences, positions)
+        entropies, log_probs, ranks = self._row_statistics(logits, target_ids)
+        
+        # Keep whole-span rows for the candidate generator (clone so the
+        # cache doesn't pin the full batch)
+        for row, key in span_rows:
+            self._span_logits.put(key, logits[row].clone())
+        
+        for sent_idx, alignment, first_row, num_pieces in word_rows:
+            rows = slice(first_row, first_row + num_pieces)
+            if num_pieces == 1:
+                entropy = entropies[first_row]
+                log_prob = log_probs[first_row]
+                rank = ranks[first_row]
+            else:
+                # Average entropy and total log prob across pieces
+                entropy = float(np.mean(entropies[rows]))
+                log_prob = sum(log_probs[rows])
+                rank = self._approximate_rank(log_prob)
             
-            scores.append(score)
+            for column, value in zip(
+                columns[sent_idx],
+                (alignment.word_idx, alignment.word_text, entropy, log_prob, rank)
+            ):
+                column.append(value)
         
-        return scores
+        return [ScoreArrays.from_columns(*cols) for cols in columns]
+    
+    def _masked_logits(
+        self,
+        sequences: List[List[int]],
+        positions: List[int]
+    ) -> torch.Tensor:
+        """
+        Run masked sequences through the model in padded batches.
+        
+        Args:
+            sequences: Masked token ID sequences (may differ in length)
+            positions: Position to read logits from in each sequence
+        
+        Returns:
+            Logits at the requested positions [len(sequences), vocab_size]
+        """
+        pad_id = self.pad_id
+        rows = []
+        
+        for start in range(0, len(sequences), self.batch_size):
+            chunk = sequences[start:start + self.batch_size]
+            chunk_positions = positions[start:start + self.batch_size]
+            
+            # Right-pad to the longest sequence in the chunk (or its
+            # length bucket, so a compiled model sees few distinct shapes)
+            max_len = max(len(ids) for ids in chunk)
+            num_rows = len(chunk)
+            if self.compiled:
+                # Fixed batch dimension too: a short final chunk would
+                # otherwise trigger a recompile / new CUDA graph
+                max_len = self._bucket_len(max_len)
+                num_rows = self.batch_size
+            input_buffer, mask_buffer = self._input_buffers(num_rows, max_len)
+            input_array = input_buffer.numpy()
+            mask_array = mask_buffer.numpy()
+            input_array[:num_rows, :max_len] = pad_id
+            mask_array[:num_rows, :max_len] = 0
+            mask_array[len(chunk):num_rows, 0] = 1  # filler rows attend to one pad token
+            for i, ids in enumerate(chunk):
+                input_array[i, :len(ids)] = ids
+                mask_array[i, :len(ids)] = 1
+            
+            input_tensor = input_buffer[:num_rows, :max_len]
+            attention_mask = mask_buffer[:num_rows, :max_len]
+            
+            with torch.inference_mode(), self._autocast():
+                outputs = self.model(
+                    input_ids=input_tensor.to(self.device),
+                    attention_mask=attention_mask.to(self.device)
+                )
+                # Softmax/entropy downstream always run in float32
+                rows.append(outputs.logits[torch.arange(len(chunk)), chunk_positions].float())
+        
+        return torch.cat(rows)
+    
+    BUCKET_LENGTHS = (16, 32, 64, 128, 256, 512)
+    
+    @classmethod
+    def _bucket_len(cls, length: int) -> int:
+        """Round a sequence length up to the next power-of-two bucket."""
+        for bucket in cls.BUCKET_LENGTHS:
+            if length <= bucket:
+                return bucket
+        return length
+    
+    def _warmup(self) -> None:
+        """Run each common length bucket once so compilation happens at init."""
+        print("Compiling masked LM (one-time warmup)...")
+        for bucket in self.BUCKET_LENGTHS[:4]:
+            sequence = [self.cls_id, self.mask_id] + [self.sep_id] * (bucket - 2)
+            self._masked_logits([sequence] * self.batch_size, [1] * self.batch_size)
+    
+    def _input_buffers(self, num_rows: int, length: int) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Get this thread's preallocated input_ids/attention_mask buffers.
+        
+        Buffers grow as needed and are reused across calls, so building a
+        batch only copies token IDs instead of allocating new tensors. On
+        CUDA they are pinned for faster host-to-device copies.
+        
+        Args:
+            num_rows: Rows needed
+            length: Sequence length needed
+        
+        Returns:
+            Tuple of (input_ids buffer, attention_mask buffer) on the CPU,
+            each at least [num_rows, length]
+        """
+        buffers = getattr(self._buffers, 'tensors', None)
+        if buffers is None or buffers[0].shape[0] < num_rows or buffers[0].shape[1] < length:
+            shape = (
+                max(num_rows, self.batch_size),
+                max(length, buffers[0].shape[1] if buffers is not None else 0)
+            )
+            pin = self.device.startswith("cuda")
+            buffers = (
+                torch.empty(shape, dtype=torch.long, pin_memory=pin),
+                torch.empty(shape, dtype=torch.long, pin_memory=pin)
+            )
+            self._buffers.tensors = buffers
+        return buffers
     
     def compute_windowed_pll(
         self,
@@ -270,25 +817,87 @@ class BidirectionalScorer:
         Returns:
             Total log probability for the window
         """
-        # Define window boundaries
-        start = max(1, center_pos - window_size)  # skip [CLS]
-        end = min(len(input_ids) - 1, center_pos + window_size + 1)  # skip [SEP]
+        return self.compute_windowed_pll_batch(
+            [input_ids],
+            center_pos,
+            window_size=window_size
+        )[0]
+    
+    @torch.inference_mode()
+    def compute_windowed_pll_batch(
+        self,
+        sequences: List[List[int]],
+        center_pos: int,
+        window_size: int = 5
+    ) -> List[float]:
+        """
+        Compute windowed PLL for several sequences in batched forward passes.
         
-        total_log_prob = 0.0
+        Every masked position of every sequence becomes one row of the
+        batch, so scoring N candidates costs one batched forward instead
+        of N * window separate ones.
         
-        # Mask each position in window and compute log prob
-        for pos in range(start, end):
-            masked_ids = input_ids.copy()
-            masked_ids[pos] = self.aligner.mask_token_id
+        Args:
+            sequences: Token IDs for each sequence (e.g. one per candidate)
+            center_pos: Center position (shared by all sequences)
+            window_size: Window size (±window_size tokens)
+        
+        Returns:
+            Total log probability for the window of each sequence
+        """
+        masked_sequences = []
+        positions = []
+        target_ids = []
+        owners = []
+        keys = []
+        totals = [0.0] * len(sequences)
+        
+        mask_id = self.mask_id
+        
+        for row, input_ids in enumerate(sequences):
+            # Define window boundaries
+            start = max(1, center_pos - window_size)  # skip [CLS]
+            end = min(len(input_ids) - 1, center_pos + window_size + 1)  # skip [SEP]
+            
+            # Positions scored before (e.g. by a neighbouring word's window)
+            # come from the cache
+            ids_key = tuple(input_ids)
+            window = []
+            for pos in range(start, end):
+                log_prob = self._position_log_probs.get((ids_key, pos))
+                if log_prob is None:
+                    window.append(pos)
+                else:
+                    totals[row] += log_prob
+            
+            if not window:
+                continue
             
-            with torch.no_grad():
-                input_tensor = torch.tensor([masked_ids]).to(self.device)
-                outputs = self.model(input_tensor)
-                logits = outputs.logits[0, pos]
+            # One masked copy per remaining position, built as a single
+            # array (row i masks window position i)
+            masked_rows = np.repeat(np.asarray(input_ids)[None, :], len(window), axis=0)
+            masked_rows[np.arange(len(window)), window] = mask_id
             
-            original_token_id = input_ids[pos]
-            log_prob = F.log_softmax(logits, dim=-1)[original_token_id].item()
-            total_log_prob += log_prob
+            masked_sequences.extend(masked_rows)
+            positions.extend(window)
+            target_ids.extend(input_ids[pos] for pos in window)
+            owners.extend([row] * len(window))
+            keys.extend((ids_key, pos) for pos in window)
+        
+        if not masked_sequences:
+            return totals
+        
+        # Only the target entries are needed: gather them and normalize with
+        # one logsumexp rather than materializing a full log_softmax
+        logits = self._masked_logits(masked_sequences, positions)
+        targets = torch.tensor(target_ids, device=logits.device).unsqueeze(1)
+        token_log_probs = (
+            logits.gather(1, targets) - torch.logsumexp(logits, dim=-1, keepdim=True)
+        ).squeeze(1).tolist()
+        
+        for row, key, log_prob in zip(owners, keys, token_log_probs):
+            self._position_log_probs.put(key, log_prob)
+            totals[row] += log_prob
         
-        return total_log_prob
+        return totals
 
@@ -1,20 +1,53 @@
 """Semantic preservation checks using SBERT and optional NLI."""
 
+import hashlib
+import os
+import threading
 import torch
 from typing import Optional, Tuple, List, Dict
-from sentence_transformers import SentenceTransformer, util
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
+from sentence_transformers import SentenceTransformer
+from transformers import AutoModelForSequenceClassification
 import torch.nn.functional as F
 
+from .cache_utils import LRUCache, VectorDiskCache
+from .loaders import get_tokenizer
+
 
 class SemanticChecker:
     """Check semantic preservation between original and edited sentences."""
     
+    # Sentences per SBERT forward; encode() sorts inputs by length, so each
+    # batch pads only to similar-length neighbours
+    ENCODE_BATCH_SIZE = 64
+    
+    # Labels for RoBERTa-MNLI: 0=contradiction, 1=neutral, 2=entailment
+    NLI_LABELS = ("contradiction", "neutral", "entailment")
+    
+    # Pairs per NLI forward; pairs are grouped by length, so each batch
+    # pads only to similar-length neighbours
+    NLI_BATCH_SIZE = 32
+    
+    # Inference backends; "onnx" runs ONNX Runtime sessions on CPU
+    BACKENDS = ("torch", "onnx")
+    
+    # Where exported ONNX models are kept when no cache_dir is given
+    ONNX_DEFAULT_DIR = os.path.join(os.path.expanduser("~"), ".cache", "flow", "onnx")
+    
+    # Token limit for the ONNX SBERT encoder (sentence-transformers'
+    # default max_seq_length for MiniLM/mpnet models)
+    ONNX_MAX_LENGTH = 256
+    
     def __init__(
         self,
         sbert_model: str = "all-MiniLM-L6-v2",
         nli_model: Optional[str] = None,
-        device: str = "cpu"
+        device: str = "cpu",
+        cache_size: int = 4096,
+        low_precision: bool = True,
+        compile: bool = False,
+        backend: str = "torch",
+        quantize: bool = False,
+        cache_dir: Optional[str] = None
     ):
         """
         Initialize semantic checker.
@@ -23,20 +56,349 @@ class SemanticChecker:
             sbert_model: Sentence-BERT model name
             nli_model: Optional NLI model name (e.g., "roberta-large-mnli")
             device: "cpu" or "cuda"
+            cache_size: Sentence embeddings kept for reuse
+            low_precision: On CUDA, keep SBERT and NLI weights in
+                bfloat16 (float16 on GPUs without bf16 support)
+            compile: Compile the SBERT encoder and NLI model with
+                torch.compile (dynamic shapes, as batch sizes and lengths
+                vary)
+            backend: "torch", or "onnx" to export SBERT and NLI to ONNX
+                Runtime sessions (CPU only; needs optimum[onnxruntime]).
+                Models are exported once, into cache_dir/onnx (or
+                ONNX_DEFAULT_DIR), and loaded from there afterwards
+            quantize: On CPU with the torch backend, apply dynamic int8
+                quantization to the Linear layers of SBERT and NLI
+                (slightly changes similarities and NLI confidences)
+            cache_dir: Directory for a persistent SBERT embedding cache
+                shared across runs (None disables)
         """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"backend must be one of {self.BACKENDS}")
+        if backend == "onnx" and device != "cpu":
+            raise ValueError("The ONNX backend runs on CPU only")
+        
         self.device = device
+        self.backend = backend
+        
+        # Half-size weights halve the bytes each forward reads; outputs are
+        # upcast before thresholds are compared
+        self.weight_dtype = torch.float32
+        if low_precision and device.startswith("cuda") and backend == "torch":
+            self.weight_dtype = (
+                torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+            )
+        
+        # Unit-length embeddings keyed by a digest of the sentence
+        self._embedding_cache = LRUCache(cache_size)
+        self._disk_cache = None
+        if cache_dir is not None:
+            # Embeddings depend on the model, backend, quantization, device
+            # and the dtype the encoder runs in
+            self._disk_cache = VectorDiskCache(
+                os.path.join(cache_dir, "embeddings.sqlite"),
+                namespace=(
+                    f"{sbert_model}:{backend}:{quantize and device == 'cpu'}:"
+                    f"{device}:{self.weight_dtype}"
+                )
+            )
+        
+        # Per-thread pinned host buffers for NLI inputs (CUDA only)
+        self._nli_buffers = threading.local()
+        
+        onnx_dir = (
+            os.path.join(cache_dir, "onnx") if cache_dir is not None
+            else self.ONNX_DEFAULT_DIR
+        )
         
         # Load SBERT for semantic similarity
-        self.sbert = SentenceTransformer(sbert_model, device=device)
+        if backend == "onnx":
+            # Exported encoder plus manual mean pooling (no SentenceTransformer)
+            self.sbert = None
+            sbert_id = sbert_model if "/" in sbert_model else f"sentence-transformers/{sbert_model}"
+            self.sbert_tokenizer = get_tokenizer(sbert_id)
+            self.sbert_session = self._load_onnx_model(
+                "ORTModelForFeatureExtraction", sbert_id, onnx_dir
+            )
+        else:
+            self.sbert = SentenceTransformer(sbert_model, device=device)
         
         # Optionally load NLI model for entailment checking
         self.use_nli = nli_model is not None
         if self.use_nli:
-            self.nli_tokenizer = AutoTokenizer.from_pretrained(nli_model)
-            self.nli_model = AutoModelForSequenceClassification.from_pretrained(nli_model)
-            self.nli_model.to(device)
-            self.nli_model.eval()
+            self.nli_tokenizer = get_tokenizer(nli_model)
+            if backend == "onnx":
+                self.nli_model = self._load_onnx_model(
+                    "ORTModelForSequenceClassification", nli_model, onnx_dir
+                )
+            else:
+                self.nli_model = self._load_nli_model(nli_model)
+                self.nli_model.to(device)
+                self.nli_model.eval()
+        
+        self.compiled = False
+        if backend == "onnx":
+            return  # ONNX Runtime applies its own graph optimizations
+        
+        # Inference only: never track gradients for the weights
+        self.sbert.requires_grad_(False)
+        if self.use_nli:
+            self.nli_model.requires_grad_(False)
+        
+        if quantize and device == "cpu":
+            torch.quantization.quantize_dynamic(
+                self.sbert[0].auto_model, {torch.nn.Linear},
+                dtype=torch.qint8, inplace=True
+            )
+            if self.use_nli:
+                self.nli_model = torch.quantization.quantize_dynamic(
+                    self.nli_model, {torch.nn.Linear}, dtype=torch.qint8
+                )
+        
+        if self.weight_dtype != torch.float32:
+            self.sbert.to(self.weight_dtype)
+            if self.use_nli:
+                self.nli_model.to(self.weight_dtype)
+        
+        if compile and hasattr(torch, "compile"):
+            # SBERT and NLI batches vary freely in size and length, so both
+            # are compiled with dynamic shapes (no CUDA graphs, which would
+            # be recaptured for every new shape)
+            encoder = self.sbert[0]
+            encoder.auto_model = torch.compile(encoder.auto_model, dynamic=True)
+            if self.use_nli:
+                self.nli_model = torch.compile(self.nli_model, dynamic=True)
+            self.compiled = True
+    
+    @staticmethod
+    def _load_nli_model(model_name: str) -> AutoModelForSequenceClassification:
+        """
+        Load the NLI model without an initial randomly initialized copy.
+        
+        Weights load as float32 whatever the checkpoint's dtype: dynamic
+        quantization needs float32 Linear layers, and reduced precision is
+        applied afterwards (see __init__). Falls back to the default
+        loading when low_cpu_mem_usage is unavailable (it needs accelerate
+        on older transformers).
+        """
+        try:
+            return AutoModelForSequenceClassification.from_pretrained(
+                model_name,
+                torch_dtype=torch.float32,
+                low_cpu_mem_usage=True
+            )
+        except (TypeError, ValueError, ImportError):
+            return AutoModelForSequenceClassification.from_pretrained(model_name)
+    
+    @staticmethod
+    def _load_onnx_model(class_name: str, model_name: str, onnx_dir: str):
+        """
+        Load a model as an ONNX Runtime session on CPU.
+        
+        The first load exports the model and saves the ONNX graph under
+        onnx_dir; later loads read it back without exporting again.
+        
+        Args:
+            class_name: optimum.onnxruntime model class to load with
+            model_name: HuggingFace model name
+            onnx_dir: Directory holding exported models
+        
+        Returns:
+            ORTModel instance, callable like the transformers model
+        
+        Raises:
+            ImportError: If optimum[onnxruntime] is not installed
+        """
+        try:
+            import onnxruntime
+            from optimum import onnxruntime as optimum_ort
+        except ImportError as e:
+            raise ImportError(
+                "The ONNX backend needs optimum[onnxruntime]: "
+                "pip install 'optimum[onnxruntime]'"
+            ) from e
+        
+        # Half the cores per session leaves room for the masked LM
+        session_options = onnxruntime.SessionOptions()
+        session_options.graph_optimization_level = (
+            onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        )
+        session_options.intra_op_num_threads = max(1, (os.cpu_count() or 2) // 2)
+        
+        model_class = getattr(optimum_ort, class_name)
+        export_path = os.path.join(onnx_dir, model_name.replace("/", "--"))
+        if os.path.isfile(os.path.join(export_path, "model.onnx")):
+            return model_class.from_pretrained(
+                export_path,
+                export=False,
+                provider="CPUExecutionProvider",
+                session_options=session_options
+            )
+        
+        model = model_class.from_pretrained(
+            model_name,
+            export=True,
+            provider="CPUExecutionProvider",
+            session_options=session_options
+        )
+        model.save_pretrained(export_path)
+        return model
+    
+    @torch.inference_mode()
+    def encode(self, text: str) -> torch.Tensor:
+        """
+        Encode a sentence with SBERT.
+        
+        Args:
+            text: Sentence to encode
+        
+        Returns:
+            Unit-length sentence embedding tensor (cached; do not modify)
+        """
+        return self._encode_cached(text)
+    
+    @staticmethod
+    def _cache_key(text: str) -> bytes:
+        """Compact fixed-size cache key for a sentence."""
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+    
+    def _encode_cached(self, text: str) -> torch.Tensor:
+        """
+        Encode one sentence, reusing its embedding if seen recently.
+        
+        Args:
+            text: Sentence to encode
+        
+        Returns:
+            Unit-length sentence embedding tensor
+        """
+        key = self._cache_key(text)
+        return self._embedding_cache.get_or_compute(
+            key,
+            lambda: self._embed_uncached({key: text})[0]
+        )
     
+    def _encode_many_cached(self, texts: List[str]) -> torch.Tensor:
+        """
+        Encode sentences, running SBERT once over only the uncached ones.
+        
+        Args:
+            texts: Sentences to encode
+        
+        Returns:
+            Unit-length embeddings [len(texts), dim]
+        """
+        keys = [self._cache_key(text) for text in texts]
+        embeddings = [self._embedding_cache.get(key) for key in keys]
+        
+        # Encode each distinct missing sentence once
+        missing = {}
+        for i, embedding in enumerate(embeddings):
+            if embedding is None:
+                missing.setdefault(keys[i], texts[i])
+        
+        if missing:
+            computed = self._embed_uncached(missing)
+            for key, embedding in zip(missing, computed):
+                self._embedding_cache.put(key, embedding)
+            computed_by_key = dict(zip(missing, computed))
+            embeddings = [
+                embedding if embedding is not None else computed_by_key[key]
+                for key, embedding in zip(keys, embeddings)
+            ]
+        
+        return torch.stack(embeddings)
+    
+    def _embed_uncached(self, texts_by_key: Dict[bytes, str]) -> List[torch.Tensor]:
+        """
+        Embed sentences missing from the in-process cache.
+        
+        Embeddings stored on disk are loaded; the rest go through SBERT in
+        one batch and are written back.
+        
+        Args:
+            texts_by_key: Sentences keyed by their cache key
+        
+        Returns:
+            Unit-length embedding for each sentence, in the same order
+        """
+        keys = list(texts_by_key)
+        embeddings = [None] * len(keys)
+        if self._disk_cache is not None:
+            for i, vector in enumerate(self._disk_cache.get_many(keys)):
+                if vector is not None:
+                    # Stored in float16; restore unit length after upcasting
+                    embeddings[i] = F.normalize(
+                        torch.from_numpy(vector).to(self.device), dim=0
+                    )
+        
+        pending = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if pending:
+            computed = self._encode([texts_by_key[keys[i]] for i in pending])
+            for i, embedding in zip(pending, computed):
+                embeddings[i] = embedding
+            if self._disk_cache is not None:
+                vectors = computed.cpu().numpy()
+                self._disk_cache.put_many([
+                    (keys[i], vector) for i, vector in zip(pending, vectors)
+                ])
+        
+        return embeddings
+    
+    def _encode(self, texts):
+        """
+        Run SBERT with the checker's encoding settings.
+        
+        Args:
+            texts: A sentence or a list of sentences
+        
+        Returns:
+            Unit-length embedding tensor ([dim] or [len(texts), dim])
+        """
+        if self.sbert is None:
+            return self._encode_onnx(texts)
+        return self.sbert.encode(
+            texts,
+            batch_size=self.ENCODE_BATCH_SIZE,
+            show_progress_bar=False,
+            convert_to_tensor=True,
+            normalize_embeddings=True,
+            device=self.device
+        ).float()
+    
+    def _encode_onnx(self, texts):
+        """
+        Encode with the ONNX SBERT session: mean pooling, then normalization.
+        
+        Args:
+            texts: A sentence or a list of sentences
+        
+        Returns:
+            Unit-length embedding tensor ([dim] or [len(texts), dim])
+        """
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+        
+        # Length-sorted batches, as SentenceTransformer.encode does
+        order = sorted(range(len(batch)), key=lambda i: len(batch[i]))
+        embeddings = [None] * len(batch)
+        for start in range(0, len(order), self.ENCODE_BATCH_SIZE):
+            indices = order[start:start + self.ENCODE_BATCH_SIZE]
+            inputs = self.sbert_tokenizer(
+                [batch[i] for i in indices],
+                padding=True,
+                truncation=True,
+                max_length=self.ONNX_MAX_LENGTH,
+                return_tensors="pt"
+            )
+            hidden = self.sbert_session(**inputs).last_hidden_state.float()
+            mask = inputs["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+            pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+            for i, embedding in zip(indices, F.normalize(pooled, dim=-1)):
+                embeddings[i] = embedding
+        
+        return embeddings[0] if single else torch.stack(embeddings)
+    
+    @torch.inference_mode()
     def compute_similarity(self, text1: str, text2: str) -> float:
         """
         Compute cosine similarity between two sentences.
@@ -48,15 +410,15 @@ class SemanticChecker:
         Returns:
             Cosine similarity score [0, 1]
         """
-        # Encode sentences
-        embeddings = self.sbert.encode(
-            [text1, text2],
-            convert_to_tensor=True,
-            device=self.device
-        )
+        if self._same_text(text1, text2):
+            return 1.0
+        
+        # Encode sentences (the original side is usually cached)
+        embedding1 = self._encode_cached(text1)
+        embedding2 = self._encode_cached(text2)
         
-        # Compute cosine similarity
-        similarity = util.cos_sim(embeddings[0], embeddings[1]).item()
+        # Embeddings are unit length, so cosine similarity is their dot product
+        similarity = float(torch.dot(embedding1, embedding2))
         
         return similarity
     
@@ -72,39 +434,127 @@ class SemanticChecker:
             Tuple of (label, confidence) where label is one of:
             "entailment", "neutral", "contradiction"
         """
+        return self.check_entailment_batch(premise, [hypothesis])[0]
+    
+    @torch.inference_mode()
+    def check_entailment_batch(
+        self,
+        premise: str,
+        hypotheses: List[str]
+    ) -> List[Tuple[str, float]]:
+        """
+        Check several hypotheses against one premise in batched NLI forwards.
+        
+        Pairs are sorted by length and split into batches of
+        NLI_BATCH_SIZE, so short pairs aren't padded to the longest one.
+        
+        Args:
+            premise: Original sentence
+            hypotheses: Modified sentences
+        
+        Returns:
+            (label, confidence) for each hypothesis
+        """
         if not self.use_nli:
-            return "neutral", 0.0
+            return [("neutral", 0.0)] * len(hypotheses)
+        if not hypotheses:
+            return []
+        
+        # The premise is shared, so hypothesis length orders the pairs
+        order = sorted(range(len(hypotheses)), key=lambda i: len(hypotheses[i]))
+        results = [None] * len(hypotheses)
+        for start in range(0, len(order), self.NLI_BATCH_SIZE):
+            indices = order[start:start + self.NLI_BATCH_SIZE]
+            verdicts = self._entailment_forward(premise, [hypotheses[i] for i in indices])
+            for i, verdict in zip(indices, verdicts):
+                results[i] = verdict
         
-        # Tokenize
+        return results
+    
+    def _entailment_forward(
+        self,
+        premise: str,
+        hypotheses: List[str]
+    ) -> List[Tuple[str, float]]:
+        """Run one NLI forward over a premise and a batch of hypotheses."""
+        # Tokenize all pairs, padded to the longest
         inputs = self.nli_tokenizer(
-            premise,
-            hypothesis,
-            return_tensors="pt",
+            [premise] * len(hypotheses),
+            hypotheses,
+            padding=True,
+            return_tensors="np",
             truncation=True,
             max_length=512
-        ).to(self.device)
+        )
         
-        # Get predictions
-        with torch.no_grad():
-            outputs = self.nli_model(**inputs)
-            logits = outputs.logits
+        if self.device.startswith("cuda"):
+            # Copy into reusable pinned host memory so the transfer runs
+            # asynchronously; the forward is queued on the same stream, so
+            # it waits for it
+            inputs = {
+                name: self._pinned_copy(name, array).to(self.device, non_blocking=True)
+                for name, array in inputs.items()
+            }
+        else:
+            # Share the tokenizer's arrays instead of allocating tensors
+            inputs = {
+                name: torch.from_numpy(array).to(self.device)
+                for name, array in inputs.items()
+            }
         
-        # Get probabilities
-        probs = F.softmax(logits, dim=-1)[0]
+        # Get predictions (already under inference_mode)
+        logits = self.nli_model(**inputs).logits
         
-        # Labels for RoBERTa-MNLI: 0=contradiction, 1=neutral, 2=entailment
-        labels = ["contradiction", "neutral", "entailment"]
-        pred_idx = torch.argmax(probs).item()
-        confidence = probs[pred_idx].item()
+        # Most probable label for every pair straight from the logits
+        # (softmax is monotonic); its probability needs only the max logit
+        # and the log-normalizer
+        logits = logits.float()
+        max_logits, pred_indices = logits.max(dim=-1)
+        confidences = (max_logits - torch.logsumexp(logits, dim=-1)).exp()
         
-        return labels[pred_idx], confidence
+        return [
+            (self.NLI_LABELS[pred_idx], confidence)
+            for pred_idx, confidence in zip(pred_indices.tolist(), confidences.tolist())
+        ]
+    
+    def _pinned_copy(self, name: str, array) -> torch.Tensor:
+        """
+        Copy a tokenizer output into this thread's pinned buffer for it.
+        
+        Buffers grow as needed and are reused across calls, so each batch
+        only copies token IDs instead of pinning a new tensor.
+        
+        Args:
+            name: Tokenizer output name (input_ids, attention_mask, ...)
+            array: Integer array [num_pairs, seq_len]
+        
+        Returns:
+            View of the buffer holding the array's values
+        """
+        buffers = getattr(self._nli_buffers, 'tensors', None)
+        if buffers is None:
+            buffers = self._nli_buffers.tensors = {}
+        
+        rows, length = array.shape
+        buffer = buffers.get(name)
+        if buffer is None or buffer.shape[0] < rows or buffer.shape[1] < length:
+            shape = (
+                max(rows, self.NLI_BATCH_SIZE),
+                max(length, buffer.shape[1] if buffer is not None else 0)
+            )
+            buffer = buffers[name] = torch.empty(shape, dtype=torch.long, pin_memory=True)
+        
+        view = buffer[:rows, :length]
+        view.numpy()[...] = array
+        return view
     
     def is_semantically_preserved(
         self,
         original: str,
         modified: str,
         min_similarity: float = 0.95,
-        allow_contradiction: bool = False
+        allow_contradiction: bool = False,
+        similarity: Optional[float] = None
     ) -> Tuple[bool, Dict[str, any]]:
         """
         Check if semantic meaning is preserved in modified sentence.
@@ -114,39 +564,90 @@ class SemanticChecker:
             modified: Modified sentence
             min_similarity: Minimum required cosine similarity
             allow_contradiction: Whether to allow NLI contradictions
+            similarity: Already computed cosine similarity of the pair
+                (skips re-encoding both sentences)
         
         Returns:
             Tuple of (is_preserved, details_dict)
         """
         # Compute similarity
-        similarity = self.compute_similarity(original, modified)
+        if similarity is None:
+            similarity = self.compute_similarity(original, modified)
+        
+        return self.batch_is_semantically_preserved(
+            original,
+            [modified],
+            min_similarity=min_similarity,
+            allow_contradiction=allow_contradiction,
+            similarities=[similarity]
+        )[0]
+    
+    def batch_is_semantically_preserved(
+        self,
+        original: str,
+        modifieds: List[str],
+        min_similarity: float = 0.95,
+        allow_contradiction: bool = False,
+        similarities: Optional[List[float]] = None
+    ) -> List[Tuple[bool, Dict[str, any]]]:
+        """
+        Check semantic preservation for several modified sentences at once.
         
-        details = {
-            "similarity": similarity,
-            "nli_label": None,
-            "nli_confidence": None
-        }
+        Runs one SBERT batch (unless similarities are given) and one NLI
+        forward over the modifications that clear the similarity threshold.
         
-        # Check similarity threshold
-        if similarity < min_similarity:
-            return False, details
+        Args:
+            original: Original sentence
+            modifieds: Modified sentences
+            min_similarity: Minimum required cosine similarity
+            allow_contradiction: Whether to allow NLI contradictions
+            similarities: Already computed cosine similarity of each pair
         
-        # Check NLI if available
+        Returns:
+            (is_preserved, details_dict) for each modified sentence
+        """
+        if similarities is None:
+            similarities = self.batch_compute_similarity(original, modifieds)
+        
+        # A modification that only changes whitespace needs no NLI verdict
+        identical = [self._same_text(original, modified) for modified in modifieds]
+        
+        results = [
+            (similarity >= min_similarity, {
+                "similarity": similarity,
+                "nli_label": None,
+                "nli_confidence": None
+            })
+            for similarity in similarities
+        ]
+        
+        # Check NLI if available, only for pairs that are still candidates
         if self.use_nli:
-            nli_label, nli_confidence = self.check_entailment(original, modified)
-            details["nli_label"] = nli_label
-            details["nli_confidence"] = nli_confidence
-            
-            # Reject contradictions
-            if not allow_contradiction and nli_label == "contradiction":
-                return False, details
+            checked = [
+                i for i, (passed, _) in enumerate(results)
+                if passed and not identical[i]
+            ]
+            verdicts = self.check_entailment_batch(
+                original,
+                [modifieds[i] for i in checked]
+            )
+            for i, (nli_label, nli_confidence) in zip(checked, verdicts):
+                details = results[i][1]
+                details["nli_label"] = nli_label
+                details["nli_confidence"] = nli_confidence
+                
+                # Reject contradictions
+                if not allow_contradiction and nli_label == "contradiction":
+                    results[i] = (False, details)
         
-        return True, details
+        return results
     
+    @torch.inference_mode()
     def batch_compute_similarity(
         self,
         original: str,
-        candidates: List[str]
+        candidates: List[str],
+        original_embedding: Optional[torch.Tensor] = None
     ) -> List[float]:
         """
         Compute similarities for multiple candidates efficiently.
@@ -154,6 +655,9 @@ class SemanticChecker:
         Args:
             original: Original sentence
             candidates: List of candidate sentences
+            original_embedding: Precomputed embedding of original (from
+                encode, so unit length); looked up in the embedding cache
+                when omitted
         
         Returns:
             List of similarity scores
@@ -161,21 +665,31 @@ class SemanticChecker:
         if not candidates:
             return []
         
-        # Encode all sentences at once
-        all_texts = [original] + candidates
-        embeddings = self.sbert.encode(
-            all_texts,
-            convert_to_tensor=True,
-            device=self.device
-        )
+        # Candidates identical to the original up to whitespace have
+        # similarity 1 without running SBERT
+        similarities = [
+            1.0 if self._same_text(original, candidate) else None
+            for candidate in candidates
+        ]
+        pending = [i for i, similarity in enumerate(similarities) if similarity is None]
+        if not pending:
+            return similarities
         
-        # Compute similarities
-        original_embedding = embeddings[0]
-        similarities = []
+        # Unit-length embeddings make cosine similarity a plain dot product.
+        # Only sentences missing from the cache go through SBERT
+        if original_embedding is None:
+            original_embedding = self._encode_cached(original)
+        candidate_embeddings = self._encode_many_cached([candidates[i] for i in pending])
         
-        for candidate_embedding in embeddings[1:]:
-            similarity = util.cos_sim(original_embedding, candidate_embedding).item()
-            similarities.append(similarity)
+        # All similarities in one matrix-vector product and one transfer
+        computed = torch.mv(candidate_embeddings, original_embedding).cpu().tolist()
+        for i, similarity in zip(pending, computed):
+            similarities[i] = similarity
         
         return similarities
+    
+    @staticmethod
+    def _same_text(text1: str, text2: str) -> bool:
+        """Check whether two sentences are identical up to whitespace."""
+        return text1 == text2 or text1.split() == text2.split()
 
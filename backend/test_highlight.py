@@ -3,8 +3,11 @@
 Test the highlight mode functionality.
 """
 
+from unittest import mock
+
 from .config import FlowConfig
 from .refinement_pipeline import RefinementPipeline
+from . import api_server
 
 
 def test_highlight_mode():
@@ -51,6 +54,50 @@ def test_highlight_mode():
     print("=" * 70)
 
 
+def test_common_sentence_screening_is_opt_in():
+    """Test that common-word sentences are scored unless screening is on."""
+    
+    print("Testing common-sentence screening...")
+    
+    sentence = "The utilize of it is good."
+    words = ["The", "utilize", "of", "it", "is", "good", "."]
+    
+    fake_pipeline = mock.Mock()
+    fake_pipeline.config = FlowConfig()
+    fake_pipeline._split_sentences_with_spans.return_value = [
+        (sentence, 0, len(sentence))
+    ]
+    fake_pipeline.constraints.extract_words_batch.return_value = [words]
+    
+    def run(common_words, **request_fields):
+        batcher = mock.Mock()
+        batcher.submit_many_threadsafe.side_effect = lambda items: [[] for _ in items]
+        with mock.patch.object(api_server, "pipeline", fake_pipeline), \
+                mock.patch.object(api_server, "score_batcher", batcher), \
+                mock.patch.object(api_server, "common_words", common_words):
+            result = api_server.run_highlight(
+                api_server.HighlightRequest(text=sentence, **request_fields)
+            )
+        scored = batcher.submit_many_threadsafe.call_args[0][0]
+        return result, scored
+    
+    # Every word counts as common, so screening would skip the sentence
+    all_common = frozenset(word.lower() for word in words)
+    
+    unscreened_result, unscreened_scored = run(frozenset())
+    default_result, default_scored = run(all_common)
+    assert default_scored == unscreened_scored == [(sentence, words)], \
+        "Sentence should be scored when screening is off"
+    assert default_result == unscreened_result, \
+        "Screening off should give the unscreened result"
+    
+    _, screened_scored = run(all_common, screen_common_sentences=True)
+    assert screened_scored == [], "Screening on should skip the sentence"
+    
+    print("✓ Common-sentence screening is opt-in")
+
+
 if __name__ == "__main__":
+    test_common_sentence_screening_is_opt_in()
     test_highlight_mode()
 
@@ -1,8 +1,10 @@
 """Tokenizer and alignment utilities for word-to-subword mapping."""
 
-from typing import List, Tuple, Dict, Optional
+from typing import List, Tuple, Dict, Optional, Sequence
 from dataclasses import dataclass
-from transformers import AutoTokenizer
+import numpy as np
+from .cache_utils import LRUCache
+from .loaders import get_tokenizer
 
 
 @dataclass
@@ -20,24 +22,52 @@ class WordAlignment:
 class TokenizerAligner:
     """Handles tokenization and alignment between words and subword pieces."""
     
-    def __init__(self, model_name: str = "roberta-large"):
+    def __init__(
+        self,
+        model_name: str = "roberta-large",
+        cache_size: int = 4096,
+        word_cache_size: int = 65536
+    ):
         """
         Initialize the tokenizer aligner.
         
         Args:
             model_name: HuggingFace model name for tokenizer
+            cache_size: Entries kept in the encoding/alignment caches
+            word_cache_size: Entries kept in the single-word encoding cache
+                (candidate words recur across sentences)
         """
-        self.tokenizer = AutoTokenizer.from_pretrained(
-            model_name,
-            use_fast=True
-        )
+        # Shared with every other aligner/scorer for the same model
+        self.tokenizer = get_tokenizer(model_name)
         self.mask_token_id = self.tokenizer.mask_token_id
         self.mask_token = self.tokenizer.mask_token
+        
+        self._encode_cache = LRUCache(cache_size)
+        self._align_cache = LRUCache(cache_size)
+        self._word_cache = LRUCache(word_cache_size)
+    
+    def encode(self, text: str) -> List[int]:
+        """
+        Tokenize a sentence, including special tokens.
+        
+        Args:
+            text: Sentence text
+        
+        Returns:
+            Token IDs
+        """
+        input_ids = self._encode_cache.get_or_compute(
+            text,
+            lambda: self.tokenizer(text, add_special_tokens=True)['input_ids']
+        )
+        return list(input_ids)
     
     def align_words_to_tokens(self, text: str, words: List[str]) -> List[WordAlignment]:
         """
         Align words to their subword token spans.
         
+        Results are cached on (text, words).
+        
         Args:
             text: Original text
             words: List of words (e.g., from spaCy tokenization)
@@ -45,6 +75,39 @@ class TokenizerAligner:
         Returns:
             List of WordAlignment objects
         """
+        _, alignments = self.encode_and_align(text, words)
+        return alignments
+    
+    def encode_and_align(
+        self,
+        text: str,
+        words: List[str]
+    ) -> Tuple[List[int], List[WordAlignment]]:
+        """
+        Tokenize a sentence and align its words with one tokenizer call.
+        
+        Results are cached on (text, words), so recurring sentences skip
+        tokenization entirely.
+        
+        Args:
+            text: Sentence text
+            words: List of words (e.g., from spaCy tokenization)
+        
+        Returns:
+            Tuple of (token IDs, list of WordAlignment objects)
+        """
+        input_ids, alignments = self._align_cache.get_or_compute(
+            (text, tuple(words)),
+            lambda: self._align_words_to_tokens(text, words)
+        )
+        return list(input_ids), list(alignments)
+    
+    def _align_words_to_tokens(
+        self,
+        text: str,
+        words: List[str]
+    ) -> Tuple[Tuple[int, ...], Tuple[WordAlignment, ...]]:
+        """Tokenize and compute word alignments (uncached)."""
         # Tokenize with offset mapping
         encoding = self.tokenizer(
             text,
@@ -55,11 +118,8 @@ class TokenizerAligner:
         offset_mapping = encoding['offset_mapping']
         input_ids = encoding['input_ids']
         
-        # Build character-to-token mapping
-        char_to_token = {}
-        for token_idx, (start, end) in enumerate(offset_mapping):
-            for char_idx in range(start, end):
-                char_to_token[char_idx] = token_idx
+        # The same encoding serves plain encode() calls
+        self._encode_cache.put(text, input_ids)
         
         # Find word positions in text
         alignments = []
@@ -75,17 +135,21 @@ class TokenizerAligner:
             char_end = char_start + len(word)
             search_start = char_end
             
-            # Map character span to token span
-            token_indices = set()
-            for char_idx in range(char_start, char_end):
-                if char_idx in char_to_token:
-                    token_indices.add(char_to_token[char_idx])
-            
-            if not token_indices:
+            # Map character span to token span: the fast tokenizer knows the
+            # token holding the first character; the span then runs over
+            # every following token that still overlaps the word (special
+            # tokens have empty offsets and stop it)
+            token_start = encoding.char_to_token(char_start)
+            if token_start is None:
                 continue
             
-            token_start = min(token_indices)
-            token_end = max(token_indices) + 1
+            token_end = token_start + 1
+            while token_end < len(offset_mapping):
+                start, end = offset_mapping[token_end]
+                if start >= char_end or end <= start:
+                    break
+                token_end += 1
+            
             token_ids = input_ids[token_start:token_end]
             
             alignments.append(WordAlignment(
@@ -98,11 +162,17 @@ class TokenizerAligner:
                 token_ids=token_ids
             ))
         
-        return alignments
+        return tuple(input_ids), tuple(alignments)
+    
+    def clear_cache(self) -> None:
+        """Drop cached encodings and alignments (e.g. after swapping tokenizers)."""
+        self._encode_cache.clear()
+        self._align_cache.clear()
+        self._word_cache.clear()
     
     def mask_word_span(
         self,
-        input_ids: List[int],
+        input_ids: Sequence[int],
         word_alignment: WordAlignment,
         mask_position: Optional[int] = None
     ) -> List[int]:
@@ -110,7 +180,7 @@ class TokenizerAligner:
         Create a masked version of input_ids for a specific word.
         
         Args:
-            input_ids: Original token IDs
+            input_ids: Original token IDs (list or array)
             word_alignment: Word alignment info
             mask_position: If specified, only mask this position within the span
                           (for PLL computation). Otherwise mask entire span.
@@ -118,19 +188,52 @@ class TokenizerAligner:
         Returns:
             Masked token IDs
         """
-        masked_ids = input_ids.copy()
+        masked_ids = list(input_ids)
         
         if mask_position is not None:
             # Mask only one position (for PLL)
             if word_alignment.token_start + mask_position < word_alignment.token_end:
                 masked_ids[word_alignment.token_start + mask_position] = self.mask_token_id
         else:
-            # Mask entire word span
-            for i in range(word_alignment.token_start, word_alignment.token_end):
-                masked_ids[i] = self.mask_token_id
+            # Mask entire word span with one slice assignment
+            start, end = word_alignment.token_start, word_alignment.token_end
+            masked_ids[start:end] = [self.mask_token_id] * (end - start)
         
         return masked_ids
     
+    def batch_mask_word_positions(
+        self,
+        input_ids: Sequence[int],
+        word_alignment: WordAlignment,
+        mask_following: bool = False
+    ) -> np.ndarray:
+        """
+        Mask each position of a word in its own copy of the sentence.
+        
+        All copies come from one broadcast comparison rather than a list
+        copy per position, ready to be stacked into one forward pass.
+        
+        Args:
+            input_ids: Original token IDs
+            word_alignment: Word alignment info
+            mask_following: Also mask the rest of the word to the right of
+                each position (word-l2r PLL)
+        
+        Returns:
+            Token IDs [num_pieces, seq_len]; row i has position
+            token_start + i masked
+        """
+        num_pieces = word_alignment.token_end - word_alignment.token_start
+        columns = np.arange(len(input_ids))[None, :]
+        piece_starts = word_alignment.token_start + np.arange(num_pieces)[:, None]
+        
+        if mask_following:
+            mask = (columns >= piece_starts) & (columns < word_alignment.token_end)
+        else:
+            mask = columns == piece_starts
+        
+        return np.where(mask, self.mask_token_id, np.asarray(input_ids))
+    
     def decode_tokens(self, token_ids: List[int]) -> str:
         """Decode token IDs to text."""
         return self.tokenizer.decode(token_ids, skip_special_tokens=False)
@@ -149,17 +252,173 @@ class TokenizerAligner:
         Returns:
             Token IDs (excluding special tokens)
         """
-        encoding = self.tokenizer(
+        return list(self._encode_word_cached(word))
+    
+    def encode_words(self, words: List[str]) -> List[List[int]]:
+        """
+        Encode several words to token IDs.
+        
+        Words not already cached are tokenized in one batched call.
+        
+        Args:
+            words: Words to encode
+        
+        Returns:
+            Token IDs for each word (excluding special tokens)
+        """
+        return [list(ids) for ids in self._encode_words_cached(words)]
+    
+    def _encode_word_cached(self, word: str) -> Tuple[int, ...]:
+        """Encode a word without special tokens, reusing recent results."""
+        return self._word_cache.get_or_compute(
             word,
-            add_special_tokens=False
+            lambda: tuple(self.tokenizer(word, add_special_tokens=False)['input_ids'])
         )
-        return encoding['input_ids']
+    
+    def _encode_words_cached(self, words: List[str]) -> List[Tuple[int, ...]]:
+        """Encode words without special tokens, batching the cache misses."""
+        encoded = [self._word_cache.get(word) for word in words]
+        missing = list(dict.fromkeys(
+            word for word, ids in zip(words, encoded) if ids is None
+        ))
+        if missing:
+            batch = self.tokenizer(missing, add_special_tokens=False)['input_ids']
+            computed = {word: tuple(ids) for word, ids in zip(missing, batch)}
+            for word, ids in computed.items():
+                self._word_cache.put(word, ids)
+            encoded = [
+                ids if ids is not None else computed[word]
+                for word, ids in zip(words, encoded)
+            ]
+        return encoded
+    
+    def prepare_reconstruction(
+        self,
+        input_ids: Sequence[int],
+        word_alignment: WordAlignment
+    ) -> Tuple[List[int], List[int]]:
+        """
+        Split a sentence around a word for repeated replacement.
+        
+        Args:
+            input_ids: Original token IDs (list or array)
+            word_alignment: Alignment of word to replace
+        
+        Returns:
+            Tuple of (token IDs before the word, token IDs after the word)
+        """
+        # Always lists, so the pieces concatenate rather than add elementwise
+        return (
+            list(input_ids[:word_alignment.token_start]),
+            list(input_ids[word_alignment.token_end:])
+        )
+    
+    def tokenize_replacement(self, replacement_text: str) -> List[int]:
+        """
+        Encode a replacement word as it appears mid-sentence.
+        
+        Args:
+            replacement_text: New word to insert
+        
+        Returns:
+            Token IDs of the word, with RoBERTa's leading-space marker
+        """
+        # Encode the replacement with a space prefix for RoBERTa
+        return list(self._encode_word_cached(" " + replacement_text))
+    
+    def tokenize_replacements(self, replacement_texts: List[str]) -> List[List[int]]:
+        """
+        Encode several replacement words as they appear mid-sentence.
+        
+        Args:
+            replacement_texts: New words to insert
+        
+        Returns:
+            Token IDs of each word, with RoBERTa's leading-space marker
+        """
+        return self.encode_words([" " + text for text in replacement_texts])
+    
+    def reconstruct_ids(
+        self,
+        input_ids: List[int],
+        replacement_text: str,
+        word_alignment: WordAlignment,
+        replacement_ids: Optional[Sequence[int]] = None
+    ) -> List[int]:
+        """
+        Token IDs of a sentence with a word replaced (no decoding).
+        
+        Args:
+            input_ids: Original token IDs
+            replacement_text: New word to insert
+            word_alignment: Alignment of word to replace
+            replacement_ids: Token IDs of the replacement as returned by
+                tokenize_replacement, if already known (skips tokenizing)
+        
+        Returns:
+            Reconstructed token IDs
+        """
+        prefix_ids, suffix_ids = self.prepare_reconstruction(input_ids, word_alignment)
+        
+        if replacement_ids is None:
+            replacement_ids = self.tokenize_replacement(replacement_text)
+        
+        return prefix_ids + list(replacement_ids) + suffix_ids
+    
+    def reconstruct_ids_batch(
+        self,
+        input_ids: List[int],
+        replacement_texts: List[str],
+        word_alignment: WordAlignment,
+        replacement_ids: Optional[List[Optional[Sequence[int]]]] = None
+    ) -> List[List[int]]:
+        """
+        Token IDs of a sentence with a word replaced by each of several words.
+        
+        The sentence is split around the word once, and replacements
+        without known token IDs are tokenized in one batched call.
+        
+        Args:
+            input_ids: Original token IDs
+            replacement_texts: New words to insert
+            word_alignment: Alignment of word to replace
+            replacement_ids: Token IDs of each replacement (None where not
+                known), as returned by tokenize_replacement
+        
+        Returns:
+            Reconstructed token IDs for each replacement
+        """
+        prefix_ids, suffix_ids = self.prepare_reconstruction(input_ids, word_alignment)
+        
+        if replacement_ids is None:
+            replacement_ids = [None] * len(replacement_texts)
+        missing = [i for i, ids in enumerate(replacement_ids) if ids is None]
+        replacement_ids = list(replacement_ids)
+        if missing:
+            tokenized = self.tokenize_replacements([replacement_texts[i] for i in missing])
+            for i, ids in zip(missing, tokenized):
+                replacement_ids[i] = ids
+        
+        return [prefix_ids + list(ids) + suffix_ids for ids in replacement_ids]
+    
+    def reconstruct_text(self, new_ids: List[int]) -> str:
+        """
+        Text of a reconstructed sentence.
+        
+        Args:
+            new_ids: Token IDs from reconstruct_ids
+        
+        Returns:
+            Decoded sentence text
+        """
+        return self.decode_clean(new_ids)
     
     def reconstruct_sentence(
         self,
         input_ids: List[int],
         replacement_text: str,
-        word_alignment: WordAlignment
+        word_alignment: WordAlignment,
+        replacement_ids: Optional[Sequence[int]] = None
     ) -> Tuple[str, List[int]]:
         """
         Reconstruct sentence with a word replaced.
@@ -168,28 +427,13 @@ class TokenizerAligner:
             input_ids: Original token IDs
             replacement_text: New word to insert
             word_alignment: Alignment of word to replace
+            replacement_ids: Token IDs of the replacement as returned by
+                tokenize_replacement, if already known (skips tokenizing)
         
         Returns:
             Tuple of (reconstructed text, reconstructed token IDs)
         """
-        # Encode the replacement with a space prefix for RoBERTa
-        # Try encoding with space first, then without if that fails
-        replacement_with_space = " " + replacement_text
-        encoding_with_space = self.tokenizer(
-            replacement_with_space,
-            add_special_tokens=False
-        )
-        replacement_ids = encoding_with_space['input_ids']
-        
-        # Build new token sequence
-        new_ids = (
-            input_ids[:word_alignment.token_start] +
-            replacement_ids +
-            input_ids[word_alignment.token_end:]
+        new_ids = self.reconstruct_ids(
+            input_ids, replacement_text, word_alignment, replacement_ids
         )
-        
-        # Decode to text
-        new_text = self.decode_clean(new_ids)
-        
-        return new_text, new_ids
-
+        return self.reconstruct_text(new_ids), new_ids